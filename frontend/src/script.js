@@ -1,44 +1,98 @@
 var yearSlider = document.getElementById("yearSlider");
 var output = document.getElementById("value");
 output.innerHTML = yearSlider.value;
-fetchYear(yearSlider.value);
+
+var pyramidRoot = '/Dataset/cleanData/pyramid';
+var pyramidManifest = null;
+var pyramidCache = {};
+// ?level=<name> pins one pyramid level (e.g. 1.0) regardless of zoom
+var pinnedLevel = new URLSearchParams(window.location.search).get('level');
+
+fetch(pyramidRoot + '/manifest.json')
+    .then(response => response.json())
+    .then(manifest => {
+        pyramidManifest = manifest;
+        // the pyramid may cover fewer years than the slider (e.g. built from history only)
+        yearSlider.min = manifest.years[0];
+        yearSlider.max = manifest.years[manifest.years.length - 1];
+        output.innerHTML = yearSlider.value;
+        fetchYear(yearSlider.value);
+    })
+    .catch(error => console.error('Error reading pyramid manifest:', error));
 
 yearSlider.oninput = function() {
     output.innerHTML = this.value
     fetchYear(this.value)
 }
 
+function currentLevel() {
+    if (pinnedLevel && pyramidManifest.levels[pinnedLevel]) {
+        return pinnedLevel;
+    }
+    var zoom = map ? map.getZoom() : 7;
+    return pyramidManifest.zooms[zoom] || '0.1';
+}
+
+function availableYear(year) {
+    // nearest year the pyramid was built for
+    var years = pyramidManifest.years;
+    var best = years[0];
+    for (var i = 1; i < years.length; i++) {
+        if (Math.abs(years[i] - year) < Math.abs(best - year)) {
+            best = years[i];
+        }
+    }
+    return best;
+}
+
 function fetchYear(year) {
-    address = '/Dataset/cleanData/woodchuck_forecast_hundreds.csv';
+    if (!pyramidManifest || pyramidManifest.years.length === 0) {
+        return;
+    }
+    year = availableYear(Number(year));
+    var level = currentLevel();
+    var resolution = pyramidManifest.levels[level].resolution;
+    address = pyramidRoot + '/' + level + '/' + year + '.csv';
+
+    if (pyramidCache[address]) {
+        showData(pyramidCache[address], resolution);
+        return;
+    }
+
     console.log('Fetching from:', address);
     fetch(address)
-        .then(response => response.text())
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.status + ' ' + response.statusText + ' for ' + address);
+            }
+            return response.text();
+        })
         .then(csvContent => {
             Papa.parse(csvContent, {
                 header: true,
                 dynamicTyping: true,
+                skipEmptyLines: true,
                 complete: function(results) {
-                    dataObject = results.data;
-                    var testData = {max: 15000, data: []}
-                    console.log(dataObject)
-                    for (let i = 0; i < dataObject.length - 1; i++) {
-                        if (dataObject[i].year == year) {
-                            var filteredData = {
-                                lat: dataObject[i].latitude,
-                                lng: dataObject[i].longitude,
-                                value: dataObject[i].total_wood_chucked_lbs
-                            }
-                        testData.data.push(filteredData)
-                        }
-                    }
-                    console.log(testData.data)
-                    heatmapLayer.setData(testData);
+                    var points = results.data.map(row => ({
+                        lat: row.latitude,
+                        lng: row.longitude,
+                        value: row.total_wood_chucked_lbs
+                    }));
+                    pyramidCache[address] = points;
+                    showData(points, resolution);
                 }
             });
         })
     .catch(error => console.error('Error reading CSV:', error));
 }
 
+function showData(points, resolution) {
+    // coarser cells sum more area, so scale the colour ceiling and radius with them
+    var scale = resolution / 0.1;
+    heatmapLayer.cfg.radius = 0.3 * scale;
+    heatmapLayer.setData({max: 15000 * scale * scale, data: points});
+}
+
 var baseLayer = L.tileLayer('https://tiles.stadiamaps.com/tiles/stamen_toner/{z}/{x}/{y}{r}.{ext}', {
 	minZoom: 7,
 	maxZoom: 10,
@@ -111,4 +165,8 @@ var map = new L.Map('map', {
     center: new L.LatLng(41.203323, -77.194527),
     zoom: 7,
     layers: [polygon, baseLayer, heatmapLayer]
-});
\ No newline at end of file
+});
+
+map.on('zoomend', function() {
+    fetchYear(yearSlider.value);
+});
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from generate_forcecast_polars import forecast_locations, partition_locations
+
+KEY_COLS = ['latitude', 'longitude']
+TARGET_COLS = ['estimated_woodchuck_population', 'total_wood_chucked_lbs']
+
+
+class ProductionForecastModel:
+    """A generate_forcecast_polars model ('flat' or 'growth') behind the fit/predict interface.
+
+    fit partitions the history per location; predict runs forecast_locations,
+    so scores and timings are those of the shipped forecast code. noise_level
+    defaults to the 0.5 the forecast script and `cli.py forecast` run with.
+    """
+
+    def __init__(self, model='growth', noise_level=0.5, seed=42):
+        self.model = model
+        self.noise_level = noise_level
+        self.seed = seed
+        self.locations = None
+
+    def fit(self, history):
+        self.locations = partition_locations(pl.from_pandas(history))
+        return self
+
+    def predict(self, years):
+        frames = forecast_locations(self.locations, self.model, np.asarray(years), self.noise_level, self.seed,
+                                    verbose=False)
+        if not frames:
+            return pd.DataFrame(columns=['year'] + KEY_COLS + TARGET_COLS)
+        return pl.concat(frames).to_pandas()[['year'] + KEY_COLS + TARGET_COLS]
+
+
+class RollingForestModel:
+    """Per-cell random forest on year, time index and 3-year rolling mean, as in pred.ipynb.
+
+    Only forecasts total_wood_chucked_lbs; needs scikit-learn.
+    """
+
+    def __init__(self, n_estimators=100, max_depth=10, seed=42):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.seed = seed
+        self.cells = None
+
+    def fit(self, history):
+        from sklearn.ensemble import RandomForestRegressor
+
+        self.cells = []
+        for (lat, lon), location_data in history.groupby(KEY_COLS):
+            location_data = location_data.sort_values('year').reset_index(drop=True)
+            location_data['time_index'] = range(len(location_data))
+            location_data['rolling_mean_3'] = location_data['total_wood_chucked_lbs'].rolling(window=3, min_periods=1).mean()
+            last = location_data.iloc[-1]
+
+            model = None
+            if len(location_data) >= 3:
+                model = RandomForestRegressor(
+                    n_estimators=self.n_estimators,
+                    max_depth=self.max_depth,
+                    random_state=self.seed,
+                    n_jobs=1
+                )
+                model.fit(location_data[['year', 'time_index', 'rolling_mean_3']], location_data['total_wood_chucked_lbs'])
+            self.cells.append((lat, lon, last, model))
+        return self
+
+    def predict(self, years):
+        years = np.asarray(years)
+        frames = []
+        for lat, lon, last, model in self.cells:
+            if model is None:
+                preds = np.full(len(years), last['total_wood_chucked_lbs'], dtype=float)
+            else:
+                future_X = pd.DataFrame({
+                    'year': years,
+                    'time_index': last['time_index'] + years - last['year'],
+                    'rolling_mean_3': last['rolling_mean_3']
+                })
+                preds = model.predict(future_X)
+            frames.append(pd.DataFrame({
+                'year': years,
+                'latitude': lat,
+                'longitude': lon,
+                'estimated_woodchuck_population': np.nan,
+                'total_wood_chucked_lbs': preds
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+
+MODELS = {
+    'flat': (ProductionForecastModel, {'model': 'flat'}),
+    'growth': (ProductionForecastModel, {'model': 'growth'}),
+    'rolling_forest': (RollingForestModel, {}),
+}
+
+
+def register_model(name, factory, **params):
+    MODELS[name] = (factory, params)
+
+
+_WORKER_DATA = None
+
+
+def _init_worker(df):
+    global _WORKER_DATA
+    _WORKER_DATA = df
+
+    # pay one-off import and first-call costs here, not in the first fold's timings
+    try:
+        import sklearn.ensemble  # noqa: F401
+    except ImportError:
+        pass
+    for model in ('flat', 'growth'):
+        ProductionForecastModel(model).fit(df.head(1)).predict(np.arange(2))
+
+
+def _run_fold(model_name, factory, params, cutoff, horizon):
+    df = _WORKER_DATA
+    train = df[df['year'] <= cutoff]
+    test = df[(df['year'] > cutoff) & (df['year'] <= cutoff + horizon)]
+    years = np.arange(cutoff + 1, cutoff + horizon + 1)
+
+    start = time.perf_counter()
+    model = factory(**params).fit(train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preds = model.predict(years)
+    predict_time = time.perf_counter() - start
+
+    scored = test[['year'] + KEY_COLS + TARGET_COLS].merge(
+        preds, on=['year'] + KEY_COLS, how='inner', suffixes=('', '_pred')
+    )
+    scored['model'] = model_name
+    scored['cutoff'] = cutoff
+    return {
+        'model': model_name,
+        'cutoff': cutoff,
+        'fit_time_s': fit_time,
+        'predict_time_s': predict_time,
+        'predicted_rows': len(preds),
+        'scored': scored
+    }
+
+
+def _metrics(actual, predicted):
+    mask = actual.notna() & predicted.notna()
+    actual = actual[mask].to_numpy(float)
+    predicted = predicted[mask].to_numpy(float)
+    if len(actual) == 0:
+        return np.nan, np.nan, np.nan
+    err = predicted - actual
+    nonzero = actual != 0
+    mape = np.mean(np.abs(err[nonzero] / actual[nonzero])) * 100 if nonzero.any() else np.nan
+    return np.mean(np.abs(err)), np.sqrt(np.mean(err ** 2)), mape
+
+
+def backtest(input_file, models=None, min_train_years=3, horizon=1, max_workers=None, noise_level=None,
+             read_csv=pd.read_csv):
+    df = read_csv(input_file)
+    df['year'] = df['year'].astype(int)
+
+    years = sorted(df['year'].unique())
+    cutoffs = [y for y in years[min_train_years - 1:] if y < years[-1]]
+    if not cutoffs:
+        raise ValueError(f"Need more than {min_train_years} years of history to backtest, found {len(years)}")
+
+    selected = models if models is not None else list(MODELS)
+    tasks = []
+    for name in selected:
+        factory, params = MODELS[name]
+        if noise_level is not None and factory is ProductionForecastModel:
+            params = {**params, 'noise_level': noise_level}
+        tasks += [(name, factory, params, cutoff, horizon) for cutoff in cutoffs]
+    print(f"Running {len(tasks)} folds ({len(selected)} models x {len(cutoffs)} cutoffs)")
+
+    folds = []
+    # spawn, not fork: the forecast models run polars, whose thread pool can deadlock a forked child
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(df,)) as pool:
+        futures = [pool.submit(_run_fold, *task) for task in tasks]
+        for future, task in zip(futures, tasks):
+            try:
+                folds.append(future.result())
+            except ImportError as e:
+                print(f"Skipping {task[0]} at cutoff {task[3]}: {e}")
+
+    if not folds:
+        raise RuntimeError("No backtest folds completed")
+
+    scored = pd.concat([f['scored'] for f in folds], ignore_index=True)
+    timings = pd.DataFrame([{k: v for k, v in f.items() if k != 'scored'} for f in folds])
+
+    rows = []
+    for name, fold_times in timings.groupby('model', sort=False):
+        model_scored = scored[scored['model'] == name]
+        row = {
+            'model': name,
+            'folds': len(fold_times),
+            'scored_rows': len(model_scored),
+            'fit_time_s': fold_times['fit_time_s'].sum(),
+            'predict_time_s': fold_times['predict_time_s'].sum(),
+        }
+        row['predicted_rows_per_s'] = fold_times['predicted_rows'].sum() / max(row['predict_time_s'], 1e-9)
+        for col in TARGET_COLS:
+            mae, rmse, mape = _metrics(model_scored[col], model_scored[f'{col}_pred'])
+            row[f'{col}_mae'] = mae
+            row[f'{col}_rmse'] = rmse
+            row[f'{col}_mape'] = mape
+        rows.append(row)
+
+    return pd.DataFrame(rows), scored
+
+
+if __name__ == "__main__":
+    clean_dir = Path(__file__).resolve().parent.parent / "Dataset" / "cleanData"
+
+    summary, _ = backtest(
+        input_file=clean_dir / "woodchucks_with_wood_volume.csv",
+        min_train_years=3,
+        horizon=1
+    )
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
+
+    output_file_path = clean_dir / "forecast_backtest_summary.csv"
+    summary.to_csv(output_file_path, index=False)
+    print(f"Saved backtest summary: {output_file_path}")
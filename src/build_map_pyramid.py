@@ -0,0 +1,126 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# level name -> grid resolution in degrees (None = snap to county centroids)
+LEVELS = {
+    '0.1': 0.1,
+    '0.25': 0.25,
+    '0.5': 0.5,
+    '1.0': 1.0,
+    'county': None,
+}
+
+# Leaflet zoom -> level served at that zoom (map runs from zoom 7 to 10).
+# '1.0' is not tied to a zoom; the map shows it (or any level) with ?level=<name>
+ZOOM_LEVELS = {
+    7: 'county',
+    8: '0.5',
+    9: '0.25',
+    10: '0.1',
+}
+
+# PA counties average roughly 0.45 x 0.45 degrees
+COUNTY_RESOLUTION = 0.45
+
+VALUE_COLS = ['total_wood_chucked_lbs', 'estimated_woodchuck_population']
+
+
+def _snap_to_grid(values, resolution):
+    # nearest multiple with halves rounded up; np.round's half-to-even would
+    # make neighbouring bins alternate between holding more and fewer cells
+    return np.floor(values / resolution + 0.5) * resolution
+
+
+def _snap_to_county(df, counties):
+    coords = counties[['lat', 'long']].to_numpy(float)
+    points = df[['latitude', 'longitude']].to_numpy(float)
+    nearest = np.empty(len(points), dtype=int)
+
+    # chunked so the distance matrix stays small for long forecast files
+    for start in range(0, len(points), 50000):
+        chunk = points[start:start + 50000]
+        dist = ((chunk[:, None, :] - coords[None, :, :]) ** 2).sum(axis=2)
+        nearest[start:start + 50000] = dist.argmin(axis=1)
+
+    snapped = df.copy()
+    snapped['latitude'] = coords[nearest, 0]
+    snapped['longitude'] = coords[nearest, 1]
+    snapped['county'] = counties['CountyName'].to_numpy()[nearest]
+    return snapped
+
+
+def aggregate_level(df, resolution=None, counties=None):
+    if resolution is None:
+        binned = _snap_to_county(df, counties)
+        keys = ['year', 'county', 'latitude', 'longitude']
+    else:
+        binned = df.copy()
+        binned['latitude'] = _snap_to_grid(binned['latitude'].to_numpy(float), resolution).round(3)
+        binned['longitude'] = _snap_to_grid(binned['longitude'].to_numpy(float), resolution).round(3)
+        keys = ['year', 'latitude', 'longitude']
+
+    agg = binned.groupby(keys, as_index=False).agg(
+        **{c: (c, 'sum') for c in VALUE_COLS},
+        cells=('latitude', 'size')
+    )
+    return agg.sort_values(keys).reset_index(drop=True)
+
+
+def build_pyramid(input_file, output_dir, county_file=None, levels=None):
+    df = pd.read_csv(input_file, usecols=['year', 'latitude', 'longitude'] + VALUE_COLS)
+    df['year'] = df['year'].astype(int)
+    print(f"Loaded {len(df)} rows from {input_file}")
+
+    counties = None
+    if county_file is not None:
+        counties = pd.read_json(county_file, orient='index')
+        counties.index.name = 'CountyName'
+        counties.reset_index(inplace=True)
+
+    output_dir = Path(output_dir)
+    years = sorted(df['year'].unique())
+    manifest = {'years': [int(y) for y in years], 'zooms': {str(z): lvl for z, lvl in ZOOM_LEVELS.items()}, 'levels': {}}
+
+    for name in levels or LEVELS:
+        resolution = LEVELS[name]
+        if resolution is None and counties is None:
+            print(f"Skipping level {name}: no county coordinates file given")
+            continue
+
+        agg = aggregate_level(df, resolution, counties)
+        level_dir = output_dir / name
+        os.makedirs(level_dir, exist_ok=True)
+
+        for year, year_data in agg.groupby('year'):
+            year_data.drop(columns=['year']).to_csv(level_dir / f"{int(year)}.csv", index=False, float_format='%.6g')
+
+        manifest['levels'][name] = {
+            'resolution': resolution if resolution is not None else COUNTY_RESOLUTION,
+            'max_points_per_year': int(agg.groupby('year').size().max()),
+        }
+        print(f"Level {name}: {len(agg)} rows across {len(years)} years -> {level_dir}")
+
+    with open(output_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+if __name__ == "__main__":
+    src_dir = Path(__file__).resolve().parent
+    clean_dir = src_dir.parent / "Dataset" / "cleanData"
+
+    INPUT_FILE = clean_dir / "woodchuck_forecast_hundreds.csv"
+    if not INPUT_FILE.exists():
+        print(f"Warning: {INPUT_FILE} not found, building the pyramid from history years only")
+        INPUT_FILE = clean_dir / "woodchucks_with_wood_volume.csv"
+
+    build_pyramid(
+        input_file=INPUT_FILE,
+        output_dir=clean_dir / "pyramid",
+        county_file=src_dir / "countyNameCoords" / "coords.json"
+    )
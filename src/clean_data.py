@@ -1,40 +1,84 @@
 import pandas as pd
 import os
+from pathlib import Path
+
+from dedup_records import key_columns, make_deduplicator, row_hashes
 
 class CreateDataSet:
 
-    def __init__(self, input_file, output_dir, columns):
+    def __init__(self, input_file, output_dir, columns, dedup=None, dedup_key='occurrence',
+                 expected_records=None, false_positive_rate=0.001, chunksize=None):
         self.file_path = input_file
         self.output_dir = output_dir
         self.columns = columns
+
+        # dedup: None, 'exact' or 'bloom'; dedup_key: 'occurrence' (coords, date, observer) or 'gbifID'
+        self.dedup = dedup
+        self.dedup_key = dedup_key
+        self.expected_records = expected_records
+        self.false_positive_rate = false_positive_rate
+        self.chunksize = chunksize
+        self.key_cols = []
+        self.duplicates_dropped = 0
         
         self.raw_df = None
         self.processed_data = None
         
         os.makedirs(output_dir, exist_ok=True)
 
+    def _read_columns(self):
+        if not self.dedup:
+            return self.columns
+        header = pd.read_csv(self.file_path, sep='\t', nrows=0).columns
+        self.key_cols = key_columns(header, self.dedup_key)
+        return list(dict.fromkeys(self.columns + self.key_cols))
+
     def read_dataset(self):
         try:
             print(f"Reading file: {self.file_path}")
-            self.raw_df = pd.read_csv(self.file_path, sep='\t', usecols=self.columns)
+            self.raw_df = pd.read_csv(self.file_path, sep='\t', usecols=self._read_columns())
 
         except Exception as e:
             print(f"Failed to read dataset: {e}")
             raise
 
-    def process_data(self):
-        if self.raw_df is None:
-            self.read_dataset()
-        
-        df_filtered = self.raw_df[self.raw_df['stateProvince'] == 'Pennsylvania'].copy()
+    def _count_sightings(self, df, deduplicator=None):
+        df_filtered = df[df['stateProvince'] == 'Pennsylvania'].copy()
         df_filtered.dropna(subset=['year', 'decimalLatitude', 'decimalLongitude'], inplace=True)
+
+        if deduplicator is not None:
+            keep = deduplicator.first_seen(row_hashes(df_filtered, self.key_cols))
+            self.duplicates_dropped += int(len(keep) - keep.sum())
+            df_filtered = df_filtered[keep]
+
         df_filtered['year'] = df_filtered['year'].astype(int)
         df_filtered['month'] = df_filtered['month'].astype(int)
 
         df_filtered['latitudeGrid'] = df_filtered['decimalLatitude'].round(1)
         df_filtered['longitudeGrid'] = df_filtered['decimalLongitude'].round(1)
 
-        self.processed_data = df_filtered.groupby(['latitudeGrid', 'longitudeGrid', 'year', 'month']).size().reset_index(name='sightingCount')
+        return df_filtered.groupby(['latitudeGrid', 'longitudeGrid', 'year', 'month']).size()
+
+    def process_data(self):
+        deduplicator = make_deduplicator(self.dedup, self.expected_records, self.false_positive_rate)
+        self.duplicates_dropped = 0
+
+        if self.chunksize and self.raw_df is None:
+            # stream the export so memory is bounded by chunk size plus the dedup state
+            counts = []
+            reader = pd.read_csv(self.file_path, sep='\t', usecols=self._read_columns(), chunksize=self.chunksize)
+            for chunk in reader:
+                counts.append(self._count_sightings(chunk, deduplicator))
+            sightings = pd.concat(counts).groupby(level=[0, 1, 2, 3]).sum()
+        else:
+            if self.raw_df is None:
+                self.read_dataset()
+            sightings = self._count_sightings(self.raw_df, deduplicator)
+
+        if deduplicator is not None:
+            print(f"Dropped {self.duplicates_dropped} duplicate occurrences")
+
+        self.processed_data = sightings.reset_index(name='sightingCount')
         
     def save_data_by_year(self, beginning_year=2018):
         if self.processed_data is None:
@@ -56,14 +100,15 @@ class CreateDataSet:
 
 if __name__ == "__main__":
 
-    INPUT_FILE = '../Dataset/dirtyData/0010762-251025141854904.csv'
-    OUTPUT_FOLDER = '../Dataset/cleanData'
+    DATASET_DIR = Path(__file__).resolve().parent.parent / "Dataset"
+    INPUT_FILE = DATASET_DIR / "dirtyData" / "0010762-251025141854904.csv"
+    OUTPUT_FOLDER = DATASET_DIR / "cleanData"
     COLUMNS = ['stateProvince', 'year', 'month', 'decimalLatitude', 'decimalLongitude']
 
     try:
-        data_processor = CreateDataSet(input_file=INPUT_FILE, output_dir=OUTPUT_FOLDER, columns=COLUMNS)
+        data_processor = CreateDataSet(input_file=INPUT_FILE, output_dir=OUTPUT_FOLDER, columns=COLUMNS,
+                                       dedup='exact', chunksize=1_000_000)
         
-        data_processor.read_dataset()
         data_processor.process_data()
         data_processor.save_data_by_year(beginning_year=2018)
 
@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+from pathlib import Path
 
 class CreateDataSet:
 
@@ -46,8 +47,9 @@ class CreateDataSet:
 
 if __name__ == "__main__":
 
-    INPUT_FILE = '../Dataset/dirtyData/Population-Density-Final.csv'
-    OUTPUT_FOLDER = '../Dataset/cleanData'
+    DATASET_DIR = Path(__file__).resolve().parent.parent / "Dataset"
+    INPUT_FILE = DATASET_DIR / "dirtyData" / "Population-Density-Final.csv"
+    OUTPUT_FOLDER = DATASET_DIR / "cleanData"
     COLUMNS = ['population', 'density', 'St', 'lat', 'long']
 
     try:
@@ -0,0 +1,420 @@
+"""Single entry point for every pipeline stage.
+
+Run from anywhere: default paths resolve against the repository, not the
+working directory. Heavy libraries are imported inside each command so
+`--help` and small commands start quickly.
+
+    python src/cli.py integrate --detection-rate 0.03
+    python src/cli.py serve &
+    python src/cli.py --worker query history --year 2022
+"""
+import argparse
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+DATASET_DIR = SRC_DIR.parent / "Dataset"
+CLEAN_DIR = DATASET_DIR / "cleanData"
+DIRTY_DIR = DATASET_DIR / "dirtyData"
+
+# short names accepted by `query`
+DATASETS = {
+    'history': CLEAN_DIR / "woodchucks_with_wood_volume.csv",
+    'forecast': CLEAN_DIR / "woodchuck_forecast_hundreds.csv",
+    'forecast-parquet': CLEAN_DIR / "woodchuck_forecast_hundreds.parquet",
+    'adjusted': CLEAN_DIR / "adjusted_sightings_all_years_minimal.csv",
+    'coarse-logs': CLEAN_DIR / "coarse_log_data.csv",
+}
+
+DEFAULT_PORT = 8765
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+def cmd_clean_sightings(args, cache):
+    from clean_data import CreateDataSet
+
+    data_processor = CreateDataSet(
+        input_file=args.input,
+        output_dir=args.output_dir,
+        columns=['stateProvince', 'year', 'month', 'decimalLatitude', 'decimalLongitude'],
+        dedup=None if args.dedup == 'none' else args.dedup,
+        dedup_key=args.dedup_key,
+        expected_records=args.expected_records,
+        false_positive_rate=args.false_positive_rate,
+        chunksize=args.chunksize
+    )
+    data_processor.process_data()
+    data_processor.save_data_by_year(beginning_year=args.beginning_year)
+
+
+def cmd_clean_population(args, cache):
+    from clean_data_population_density import CreateDataSet
+
+    data_processor = CreateDataSet(input_file=args.input, output_dir=args.output_dir,
+                                   columns=['population', 'density', 'St', 'lat', 'long'])
+    data_processor.read_dataset()
+    data_processor.process_data()
+    data_processor.save_data()
+
+
+def cmd_coarse_logs(args, cache):
+    from coarse_log_data import build_coarse_log_data
+
+    build_coarse_log_data(args.input, args.counties, args.output_dir, read_csv=cache.get)
+
+
+def cmd_integrate(args, cache):
+    from integrateInOne import integrate_data
+
+    integrate_data(
+        dataset_root=args.dataset_root,
+        detection_rate=args.detection_rate,
+        estimation_mode=args.estimation_mode,
+        woodchuck_density_per_km2=args.density_per_km2,
+        woodchuck_per_person_ratio=args.per_person_ratio,
+        calibration_year=args.calibration_year,
+        calibration_total=args.calibration_total,
+        calibration_mode=args.calibration_mode,
+        read_csv=cache.get
+    )
+
+
+def cmd_final_dataset(args, cache):
+    from create_final_dataset import create_final_dataset
+
+    create_final_dataset(args.woodchucks, args.wood, args.output, read_csv=cache.get)
+
+
+def cmd_forecast(args, cache):
+    if args.incremental:
+        from incremental_forecast import update_forecast
+
+        update_forecast(args.input, args.output, model=args.model, start_year=args.start_year,
+                        end_year=args.end_year, noise_level=args.noise_level, seed=args.seed,
+                        read_csv=cache.get_polars)
+    else:
+        from generate_forcecast_polars import generate_forecast, generate_forecast_with_growth
+
+        generate = generate_forecast_with_growth if args.model == 'growth' else generate_forecast
+        generate(args.input, args.output, start_year=args.start_year, end_year=args.end_year,
+                 noise_level=args.noise_level, seed=args.seed, read_csv=cache.get_polars)
+
+
+def cmd_pipeline(args, cache):
+    from pipeline import run_pipeline
+
+    run_pipeline(
+        dataset_root=args.dataset_root,
+        debris_file=args.debris,
+        county_file=args.counties,
+        export_dir=args.export_dir,
+        forecast_model=args.model,
+        start_year=args.start_year,
+        end_year=args.end_year,
+        noise_level=args.noise_level,
+        seed=args.seed,
+        forecast_name=args.forecast_name,
+        read_csv=cache.get,
+        detection_rate=args.detection_rate,
+        estimation_mode=args.estimation_mode,
+        woodchuck_density_per_km2=args.density_per_km2,
+        woodchuck_per_person_ratio=args.per_person_ratio,
+        calibration_year=args.calibration_year,
+        calibration_total=args.calibration_total,
+        calibration_mode=args.calibration_mode
+    )
+
+
+def cmd_backtest(args, cache):
+    import pandas as pd
+    from backtest_forecasts import backtest
+
+    summary, _ = backtest(args.input, models=args.models, min_train_years=args.min_train_years,
+                          horizon=args.horizon, max_workers=args.workers, noise_level=args.noise_level,
+                          read_csv=cache.get)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"Saved backtest summary: {args.output}")
+
+
+def cmd_pyramid(args, cache):
+    from build_map_pyramid import build_pyramid
+
+    build_pyramid(args.input, args.output_dir, county_file=args.counties)
+
+
+def cmd_convert_forecast(args, cache):
+    from forecast_store import convert_csv
+
+    convert_csv(args.input, args.output, lat_band_deg=args.lat_band_deg)
+
+
+def cmd_sweep(args, cache):
+    from sweep_integration import sweep
+
+    scenarios, totals, _ = sweep(
+        dataset_root=args.dataset_root,
+        return_cells=False,
+        max_workers=args.workers,
+        read_csv=cache.get,
+        detection_rate=args.detection_rate,
+        estimation_mode=args.estimation_mode,
+        woodchuck_per_person_ratio=args.per_person_ratio,
+    )
+    summary = totals.merge(scenarios, on='scenario_id')
+    summary.to_csv(args.output, index=False)
+    print(f"Saved sweep totals: {args.output}")
+
+
+def cmd_query(args, cache):
+    path = Path(DATASETS.get(args.dataset, args.dataset))
+    if path.suffix == '.parquet':
+        from forecast_store import read_forecast
+
+        years = (args.year, args.year) if args.year is not None else None
+        df = read_forecast(path, years=years, bbox=args.bbox).to_pandas()
+    else:
+        df = cache.get(path)
+        if args.year is not None:
+            df = df[df['year'] == args.year]
+        if args.bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = args.bbox
+            df = df[df['latitude'].between(min_lat, max_lat) & df['longitude'].between(min_lon, max_lon)]
+
+    if args.columns:
+        df = df[args.columns]
+    if args.limit:
+        df = df.head(args.limit)
+    print(df.to_csv(index=False), end='')
+
+
+def cmd_serve(args, cache):
+    from resident_worker import DEFAULT_SOCKET, serve
+
+    if (args.port is not None) or (DEFAULT_SOCKET is None and args.socket is None):
+        address = (args.host, args.port or DEFAULT_PORT)
+    else:
+        address = args.socket or DEFAULT_SOCKET
+    serve(build_parser(), address)
+
+
+def _bbox(value):
+    parts = [float(v) for v in value.split(',')]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return tuple(parts)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Woodchuck data pipeline")
+    parser.add_argument('--worker', action='store_true',
+                        help="send the command to a running `serve` worker instead of running it here")
+    parser.add_argument('--worker-address', metavar='SOCKET|HOST:PORT',
+                        help="worker to use when it is not on the default per-user socket (implies --worker)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('clean-sightings', help="grid GBIF occurrences into per-year sighting counts")
+    p.add_argument('input', help="GBIF tab-separated occurrence export")
+    p.add_argument('--output-dir', default=str(CLEAN_DIR))
+    p.add_argument('--beginning-year', type=int, default=2018)
+    p.add_argument('--dedup', choices=['none', 'exact', 'bloom'], default='exact')
+    p.add_argument('--dedup-key', choices=['occurrence', 'gbifID'], default='occurrence')
+    p.add_argument('--expected-records', type=int)
+    p.add_argument('--false-positive-rate', type=float, default=0.001)
+    p.add_argument('--chunksize', type=int, default=1_000_000)
+    p.set_defaults(func=cmd_clean_sightings)
+
+    p = sub.add_parser('clean-population', help="filter population density to Pennsylvania grid cells")
+    p.add_argument('--input', default=str(DIRTY_DIR / "Population-Density-Final.csv"))
+    p.add_argument('--output-dir', default=str(CLEAN_DIR))
+    p.set_defaults(func=cmd_clean_population)
+
+    p = sub.add_parser('coarse-logs', help="sum coarse woody debris volume per county and year")
+    p.add_argument('--input', default=str(DIRTY_DIR / "PA_DWM_COARSE_WOODY_DEBRIS.csv"))
+    p.add_argument('--counties', default=str(SRC_DIR / "countyNameCoords" / "coords.json"))
+    p.add_argument('--output-dir', default=str(CLEAN_DIR))
+    p.set_defaults(func=cmd_coarse_logs)
+
+    p = sub.add_parser('integrate', help="estimate woodchuck population per grid cell")
+    p.add_argument('--dataset-root', default=str(DATASET_DIR))
+    p.add_argument('--detection-rate', type=float, default=0.02)
+    p.add_argument('--estimation-mode', choices=['hybrid', 'density', 'sightings'], default='hybrid')
+    p.add_argument('--density-per-km2', type=float)
+    p.add_argument('--per-person-ratio', type=float, default=0.05)
+    p.add_argument('--calibration-year', type=int)
+    p.add_argument('--calibration-total', type=float)
+    p.add_argument('--calibration-mode', choices=['sightings', 'density'], default='sightings')
+    p.set_defaults(func=cmd_integrate)
+
+    p = sub.add_parser('final-dataset', help="join population estimates with wood volume")
+    p.add_argument('--woodchucks', default=str(CLEAN_DIR / "adjusted_sightings_all_years_minimal.csv"))
+    p.add_argument('--wood', default=str(CLEAN_DIR / "coarse_log_data.csv"))
+    p.add_argument('--output', default=str(CLEAN_DIR / "woodchucks_with_wood_volume.csv"))
+    p.set_defaults(func=cmd_final_dataset)
+
+    p = sub.add_parser('forecast', help="forecast every location over a range of years")
+    p.add_argument('--input', default=str(DATASETS['history']))
+    p.add_argument('--output', default=str(DATASETS['forecast']))
+    p.add_argument('--model', choices=['growth', 'flat'], default='growth')
+    p.add_argument('--start-year', type=int, default=2018)
+    p.add_argument('--end-year', type=int, default=2518)
+    p.add_argument('--noise-level', type=float, default=0.5)
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--incremental', action='store_true', help="only regenerate locations whose inputs changed")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser('pipeline', help="run integrate through forecast in one process, CSV export optional")
+    p.add_argument('--dataset-root', default=str(DATASET_DIR))
+    p.add_argument('--debris', default=str(DIRTY_DIR / "PA_DWM_COARSE_WOODY_DEBRIS.csv"))
+    p.add_argument('--counties', default=str(SRC_DIR / "countyNameCoords" / "coords.json"))
+    p.add_argument('--export-dir', help="write every stage here; nothing is written without it")
+    p.add_argument('--forecast-name', default="woodchuck_forecast_hundreds.csv",
+                   help="forecast file name inside --export-dir (.parquet for the columnar format)")
+    p.add_argument('--model', choices=['growth', 'flat'], default='growth')
+    p.add_argument('--start-year', type=int, default=2018)
+    p.add_argument('--end-year', type=int, default=2518)
+    p.add_argument('--noise-level', type=float, default=0.5)
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--detection-rate', type=float, default=0.02)
+    p.add_argument('--estimation-mode', choices=['hybrid', 'density', 'sightings'], default='hybrid')
+    p.add_argument('--density-per-km2', type=float)
+    p.add_argument('--per-person-ratio', type=float, default=0.05)
+    p.add_argument('--calibration-year', type=int)
+    p.add_argument('--calibration-total', type=float)
+    p.add_argument('--calibration-mode', choices=['sightings', 'density'], default='sightings')
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser('backtest', help="rolling-origin evaluation of the forecast models")
+    p.add_argument('--input', default=str(DATASETS['history']))
+    p.add_argument('--models', nargs='+')
+    p.add_argument('--min-train-years', type=int, default=3)
+    p.add_argument('--horizon', type=int, default=1)
+    p.add_argument('--noise-level', type=float, default=0.5, help="noise of the flat and growth models")
+    p.add_argument('--workers', type=int)
+    p.add_argument('--output')
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser('pyramid', help="precompute per-zoom, per-year map aggregates")
+    p.add_argument('--input', default=str(DATASETS['forecast']))
+    p.add_argument('--output-dir', default=str(CLEAN_DIR / "pyramid"))
+    p.add_argument('--counties', default=str(SRC_DIR / "countyNameCoords" / "coords.json"))
+    p.set_defaults(func=cmd_pyramid)
+
+    p = sub.add_parser('convert-forecast', help="convert a forecast CSV to the columnar parquet format")
+    p.add_argument('--input', default=str(DATASETS['forecast']))
+    p.add_argument('--output')
+    p.add_argument('--lat-band-deg', type=float)
+    p.set_defaults(func=cmd_convert_forecast)
+
+    p = sub.add_parser('sweep', help="evaluate a grid of integrate parameters")
+    p.add_argument('--dataset-root', default=str(DATASET_DIR))
+    p.add_argument('--detection-rate', type=float, nargs='+', default=[0.01, 0.02, 0.05, 0.1])
+    p.add_argument('--estimation-mode', nargs='+', default=['hybrid', 'sightings', 'density'])
+    p.add_argument('--per-person-ratio', type=float, nargs='+', default=[0.01, 0.05, 0.1])
+    p.add_argument('--workers', type=int)
+    p.add_argument('--output', default=str(CLEAN_DIR / "integration_sweep_totals.csv"))
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser('query', help="print rows of a dataset as CSV")
+    p.add_argument('dataset', help=f"one of {', '.join(DATASETS)} or a file path")
+    p.add_argument('--year', type=int)
+    p.add_argument('--bbox', type=_bbox, help="min_lon,min_lat,max_lon,max_lat")
+    p.add_argument('--columns', nargs='+')
+    p.add_argument('--limit', type=int)
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser('serve', help="keep a resident worker with warm imports and cached datasets")
+    p.add_argument('--socket', help="Unix socket path (default: a per-user file in the temp directory)")
+    p.add_argument('--host', default='127.0.0.1', help="loopback address for a TCP worker")
+    p.add_argument('--port', type=int, help=f"serve over TCP on this port instead of a socket file (e.g. {DEFAULT_PORT})")
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+class DatasetCache:
+    """CSV frames keyed by path and read options, reloaded when the file changes on disk.
+
+    Stages take it as their read_csv, so a resident worker parses each input
+    (including files earlier requests wrote) once and serves it from memory
+    until the file changes. Outside a worker it reads straight through and
+    keeps nothing.
+    """
+
+    def __init__(self, resident=False):
+        self.resident = resident
+        self.frames = {}
+
+    def get(self, path, **read_kwargs):
+        import pandas as pd
+
+        if not self.resident:
+            return pd.read_csv(path, **read_kwargs)
+
+        path = Path(path).resolve()
+        key = (path, repr(sorted(read_kwargs.items())))
+        mtime = path.stat().st_mtime_ns
+        cached = self.frames.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, pd.read_csv(path, **read_kwargs))
+            self.frames[key] = cached
+        # shallow copy: under copy-on-write a stage's edits never reach the cached frame
+        return cached[1].copy(deep=False)
+
+    def get_polars(self, path):
+        import polars as pl
+
+        if not self.resident:
+            return pl.read_csv(path)
+        # round_trip parses floats exactly, as pl.read_csv does
+        return pl.from_pandas(self.get(path, float_precision='round_trip'))
+
+
+def _strip_worker_option(argv):
+    out = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == '--worker-address':
+            skip = True
+        elif arg != '--worker' and not arg.startswith('--worker-address='):
+            out.append(arg)
+    return out
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    worker = args.worker or args.worker_address is not None
+    if worker and args.command == 'serve':
+        parser.error("--worker cannot be combined with serve")
+    if worker:
+        from resident_worker import DEFAULT_SOCKET, parse_address, send_request
+
+        if args.worker_address is not None:
+            address = parse_address(args.worker_address)
+        elif DEFAULT_SOCKET is not None:
+            address = DEFAULT_SOCKET
+        else:
+            address = ('127.0.0.1', DEFAULT_PORT)
+        argv = _strip_worker_option(sys.argv[1:] if argv is None else argv)
+        try:
+            ok, output = send_request(address, argv)
+        except ConnectionError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(output, end='')
+        return 0 if ok else 1
+
+    args.func(args, DatasetCache())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import pandas as pd
 import json
 import os
+from pathlib import Path
 
 pa_county_code_map = {
     1: 'Adams',
@@ -72,31 +73,43 @@ pa_county_code_map = {
     133: 'York'
 }
 
-file_path = '../Dataset/dirtyData/PA_DWM_COARSE_WOODY_DEBRIS.csv'
-location_json_file = 'countyNameCoords/coords.json'
-df_debris = pd.read_csv(file_path, low_memory=False)
-df_debris = df_debris.dropna(subset=['VOLCF_AC_UNADJ'])
+def build_coarse_log_data(file_path, location_json_file, output_dir=None, start_year=2018, end_year=2025,
+                          read_csv=pd.read_csv):
+    df_debris = read_csv(file_path, low_memory=False)
+    df_debris = df_debris.dropna(subset=['VOLCF_AC_UNADJ'])
 
-df_debris = df_debris[df_debris['INVYR'].between(2018, 2025)]
+    df_debris = df_debris[df_debris['INVYR'].between(start_year, end_year)]
 
-df_locations = pd.read_json(location_json_file, orient='index')
-df_locations.index.name = 'CountyName'
-df_locations.reset_index(inplace=True)
+    df_locations = pd.read_json(location_json_file, orient='index')
+    df_locations.index.name = 'CountyName'
+    df_locations.reset_index(inplace=True)
 
-df_debris['CountyName'] = df_debris['COUNTYCD'].map(pa_county_code_map)
+    df_debris['CountyName'] = df_debris['COUNTYCD'].map(pa_county_code_map)
 
-df_final = pd.merge(df_debris, df_locations, on='CountyName', how='left')
-df_final = df_final.dropna(subset=['lat', 'long', 'VOLCF_AC_UNADJ'])
+    df_final = pd.merge(df_debris, df_locations, on='CountyName', how='left')
+    df_final = df_final.dropna(subset=['lat', 'long', 'VOLCF_AC_UNADJ'])
 
-df_output = df_final.groupby(['lat', 'long', 'INVYR']).agg({
-    'VOLCF_AC_UNADJ': 'sum'
-}).reset_index()
+    df_output = df_final.groupby(['lat', 'long', 'INVYR']).agg({
+        'VOLCF_AC_UNADJ': 'sum'
+    }).reset_index()
 
-df_output.columns = ['lat', 'long', 'year', 'VOLCF_AC_UNADJ']
-df_output = df_output.sort_values(['year', 'lat', 'long']).reset_index(drop=True)
+    df_output.columns = ['lat', 'long', 'year', 'VOLCF_AC_UNADJ']
+    df_output = df_output.sort_values(['year', 'lat', 'long']).reset_index(drop=True)
 
-output_filename = 'coarse_log_data.csv'
-output_dir = '../Dataset/cleanData'
-output_file_path = os.path.join(output_dir, output_filename)
+    if output_dir is not None:
+        output_filename = 'coarse_log_data.csv'
+        output_file_path = os.path.join(output_dir, output_filename)
 
-df_output.to_csv(output_file_path, index=False)
\ No newline at end of file
+        df_output.to_csv(output_file_path, index=False)
+    return df_output
+
+
+if __name__ == "__main__":
+    src_dir = Path(__file__).resolve().parent
+    dataset_dir = src_dir.parent / "Dataset"
+
+    build_coarse_log_data(
+        file_path=dataset_dir / "dirtyData" / "PA_DWM_COARSE_WOODY_DEBRIS.csv",
+        location_json_file=src_dir / "countyNameCoords" / "coords.json",
+        output_dir=dataset_dir / "cleanData"
+    )
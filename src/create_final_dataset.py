@@ -1,47 +1,67 @@
 import pandas as pd
 import numpy as np
+from pathlib import Path
 
-df_woodchucks = pd.read_csv('../Dataset/cleanData/adjusted_sightings_all_years_minimal.csv')
-df_wood = pd.read_csv('../Dataset/cleanData/coarse_log_data.csv')
 
-df_merged = pd.merge(
-    df_woodchucks,
-    df_wood,
-    left_on=['year', 'latitude', 'longitude'],
-    right_on=['year', 'lat', 'long'],
-    how='left'
-)
+def build_final_dataset(df_woodchucks, df_wood):
+    df_merged = pd.merge(
+        df_woodchucks,
+        df_wood,
+        left_on=['year', 'latitude', 'longitude'],
+        right_on=['year', 'lat', 'long'],
+        how='left'
+    )
 
-df_merged = df_merged.drop(columns=['lat', 'long'])
+    df_merged = df_merged.drop(columns=['lat', 'long'])
 
-missing_mask = df_merged['VOLCF_AC_UNADJ'].isna()
+    missing_mask = df_merged['VOLCF_AC_UNADJ'].isna()
 
-for idx in df_merged[missing_mask].index:
-    year = df_merged.loc[idx, 'year']
-    lat = df_merged.loc[idx, 'latitude']
-    lon = df_merged.loc[idx, 'longitude']
+    for idx in df_merged[missing_mask].index:
+        year = df_merged.loc[idx, 'year']
+        lat = df_merged.loc[idx, 'latitude']
+        lon = df_merged.loc[idx, 'longitude']
 
-    year_wood = df_wood[df_wood['year'] == year].copy()
-    
-    if len(year_wood) > 0:
-        year_wood['distance'] = np.sqrt((year_wood['lat'] - lat)**2 + (year_wood['long'] - lon)**2)
+        year_wood = df_wood[df_wood['year'] == year].copy()
 
-        nearest_idx = year_wood['distance'].idxmin()
-        df_merged.loc[idx, 'VOLCF_AC_UNADJ'] = year_wood.loc[nearest_idx, 'VOLCF_AC_UNADJ']
+        if len(year_wood) > 0:
+            year_wood['distance'] = np.sqrt((year_wood['lat'] - lat)**2 + (year_wood['long'] - lon)**2)
 
-df_merged = df_merged.sort_values(['year', 'latitude', 'longitude']).reset_index(drop=True)
+            nearest_idx = year_wood['distance'].idxmin()
+            df_merged.loc[idx, 'VOLCF_AC_UNADJ'] = year_wood.loc[nearest_idx, 'VOLCF_AC_UNADJ']
 
-min_wood = df_merged['VOLCF_AC_UNADJ'].min()
-max_wood = df_merged['VOLCF_AC_UNADJ'].max()
+    df_merged = df_merged.sort_values(['year', 'latitude', 'longitude']).reset_index(drop=True)
 
-df_merged['wood_chucked_per_woodchuck_lbs'] = (
-    (df_merged['VOLCF_AC_UNADJ'] - min_wood) / (max_wood - min_wood) * 1000
-)
+    min_wood = df_merged['VOLCF_AC_UNADJ'].min()
+    max_wood = df_merged['VOLCF_AC_UNADJ'].max()
 
-df_merged['total_wood_chucked_lbs'] = (
-    df_merged['wood_chucked_per_woodchuck_lbs'] * df_merged['estimated_woodchuck_population']
-)
+    df_merged['wood_chucked_per_woodchuck_lbs'] = (
+        (df_merged['VOLCF_AC_UNADJ'] - min_wood) / (max_wood - min_wood) * 1000
+    )
 
-df_merged = df_merged[df_merged['year'] != 2025]
+    df_merged['total_wood_chucked_lbs'] = (
+        df_merged['wood_chucked_per_woodchuck_lbs'] * df_merged['estimated_woodchuck_population']
+    )
 
-df_merged.to_csv('../Dataset/cleanData/woodchucks_with_wood_volume.csv', index=False)
+    df_merged = df_merged[df_merged['year'] != 2025]
+
+    return df_merged
+
+
+def create_final_dataset(woodchucks_file, wood_file, output_file, read_csv=pd.read_csv):
+    df_woodchucks = read_csv(woodchucks_file)
+    df_wood = read_csv(wood_file)
+
+    df_merged = build_final_dataset(df_woodchucks, df_wood)
+
+    df_merged.to_csv(output_file, index=False)
+    return df_merged
+
+
+if __name__ == "__main__":
+    clean_dir = Path(__file__).resolve().parent.parent / "Dataset" / "cleanData"
+
+    create_final_dataset(
+        woodchucks_file=clean_dir / "adjusted_sightings_all_years_minimal.csv",
+        wood_file=clean_dir / "coarse_log_data.csv",
+        output_file=clean_dir / "woodchucks_with_wood_volume.csv"
+    )
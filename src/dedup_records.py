@@ -0,0 +1,142 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# a GBIF occurrence is the same sighting if it has the same place, date and observer
+OCCURRENCE_KEY = ['decimalLatitude', 'decimalLongitude', 'eventDate', 'year', 'month', 'day', 'recordedBy']
+GBIF_ID_KEY = ['gbifID']
+
+
+def row_hashes(df, key_cols):
+    return pd.util.hash_pandas_object(df[key_cols], index=False).to_numpy(np.uint64)
+
+
+def _first_in_chunk(hashes):
+    # index of the first row carrying each distinct hash
+    return np.flatnonzero(~pd.Series(hashes).duplicated().to_numpy())
+
+
+class ExactDeduplicator:
+    """Remembers every 64-bit record hash seen, 8 bytes per distinct record.
+
+    Hashes live in sorted np.uint64 runs; each chunk adds one run and runs of
+    similar size are merged, so lookups and inserts stay vectorized.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(r) for r in self.runs)
+
+    def _contains(self, values):
+        # sorted needles keep searchsorted walking each run in order
+        order = np.argsort(values)
+        needles = values[order]
+        found = np.zeros(len(values), dtype=bool)
+        for run in self.runs:
+            pos = np.searchsorted(run, needles)
+            found[order] |= run[np.minimum(pos, len(run) - 1)] == needles
+        return found
+
+    def _add(self, values):
+        self.runs.append(np.sort(values))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], newest]), kind='mergesort')
+
+    def first_seen(self, hashes):
+        candidates = _first_in_chunk(hashes)
+        fresh = candidates[~self._contains(hashes[candidates])]
+        if len(fresh):
+            self._add(hashes[fresh])
+
+        mask = np.zeros(len(hashes), dtype=bool)
+        mask[fresh] = True
+        return mask
+
+
+class BloomDeduplicator:
+    """Fixed-size blocked Bloom filter; a false positive drops a unique record with probability ~false_positive_rate.
+
+    Each key sets num_hashes bits inside a single 64-bit word, so a lookup or
+    insert touches one word instead of num_hashes scattered bytes. Blocking
+    costs some accuracy, so the word count is chosen for the blocked layout.
+    """
+
+    def __init__(self, expected_records, false_positive_rate=0.001):
+        n = max(int(expected_records), 1)
+        # fewest words (and best bits per key for that size) meeting the rate
+        bits_per_key = 8
+        while True:
+            num_words = max(int(math.ceil(n * bits_per_key / 64)), 1)
+            rate, k = min((_blocked_rate(n / num_words, k), k) for k in range(1, 11))
+            if rate <= false_positive_rate:
+                break
+            bits_per_key += 1
+        self.num_words = num_words
+        self.num_hashes = k
+        self.words = np.zeros(num_words, dtype=np.uint64)
+
+    def _locate(self, hashes):
+        # high half picks the word (multiply-shift, no modulo); remixed bits pick the bits in it
+        word = ((hashes >> np.uint64(32)) * np.uint64(self.num_words)) >> np.uint64(32)
+        bits = hashes * np.uint64(0x9E3779B97F4A7C15)
+        mask = np.zeros(len(hashes), dtype=np.uint64)
+        for i in range(self.num_hashes):
+            mask |= np.uint64(1) << ((bits >> np.uint64(64 - 6 * (i + 1))) & np.uint64(63))
+        return word.astype(np.int64), mask
+
+    def _set(self, word, mask):
+        # fancy-index OR keeps one write per repeated word; redo the few that lost bits
+        while len(word):
+            self.words[word] |= mask
+            lost = (self.words[word] & mask) != mask
+            word, mask = word[lost], mask[lost]
+
+    def first_seen(self, hashes):
+        candidates = _first_in_chunk(hashes)
+
+        word, mask = self._locate(hashes[candidates])
+        present = (self.words[word] & mask) == mask
+
+        fresh = candidates[~present]
+        self._set(word[~present], mask[~present])
+
+        result = np.zeros(len(hashes), dtype=bool)
+        result[fresh] = True
+        return result
+
+
+def _blocked_rate(keys_per_word, k):
+    # false positive rate of a one-word blocked Bloom filter: Poisson load per word
+    rate = 0.0
+    term = math.exp(-keys_per_word)
+    for load in range(int(keys_per_word * 4) + 20):
+        if load:
+            term *= keys_per_word / load
+        rate += term * (1 - (1 - 1 / 64) ** (k * load)) ** k
+    return rate
+
+
+def make_deduplicator(mode, expected_records=None, false_positive_rate=0.001):
+    if mode is None:
+        return None
+    if mode == 'exact':
+        return ExactDeduplicator()
+    if mode == 'bloom':
+        if not expected_records:
+            raise ValueError("Bloom deduplication needs expected_records")
+        return BloomDeduplicator(expected_records, false_positive_rate)
+    raise ValueError(f"Unknown dedup mode: {mode}")
+
+
+def key_columns(available, dedup_key='occurrence'):
+    wanted = GBIF_ID_KEY if dedup_key == 'gbifID' else OCCURRENCE_KEY
+    missing = [c for c in wanted if c not in available]
+    if missing:
+        # a partial key would merge distinct sightings that share the remaining fields
+        raise ValueError(f"Export lacks {dedup_key} key columns {missing}; "
+                         f"use a different dedup_key or turn deduplication off")
+    return list(wanted)
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import polars as pl
+import pyarrow.parquet as pq
+
+DICTIONARY_COLS = ['latitude', 'longitude', 'type']
+
+
+def write_forecast(df, output_file, lat_band_deg=None, compression_level=9):
+    """Write a forecast frame as zstd parquet with one row group per year.
+
+    Coordinates (and the `type` column if present) are dictionary encoded and
+    every row group carries min/max statistics, so read_forecast can skip
+    groups by year or bounding box. With lat_band_deg set, each year is also
+    split into latitude bands to make bbox reads cheaper.
+    """
+    if not isinstance(df, pl.DataFrame):
+        df = pl.from_pandas(df)
+    df = df.sort(['year', 'latitude', 'longitude'])
+    schema = df.to_arrow().schema
+
+    if lat_band_deg:
+        df = df.with_columns((pl.col('latitude') / lat_band_deg).floor().alias('_band'))
+        group_keys = ['year', '_band']
+    else:
+        group_keys = ['year']
+
+    dict_cols = [c for c in DICTIONARY_COLS if c in schema.names]
+    with pq.ParquetWriter(
+        output_file,
+        schema,
+        compression='zstd',
+        compression_level=compression_level,
+        use_dictionary=dict_cols,
+        write_statistics=True
+    ) as writer:
+        for _, part in df.group_by(group_keys, maintain_order=True):
+            # each write_table call becomes its own row group
+            writer.write_table(part.drop('_band', strict=False).to_arrow(), row_group_size=len(part))
+
+    return output_file
+
+
+def _overlaps(stats, low, high):
+    if stats is None or not stats.has_min_max:
+        return True
+    if low is not None and stats.max < low:
+        return False
+    if high is not None and stats.min > high:
+        return False
+    return True
+
+
+def select_row_groups(metadata, year_range=None, bbox=None):
+    """Indices of row groups whose min/max statistics can match the predicates."""
+    names = metadata.schema.to_arrow_schema().names
+    bounds = {}
+    if year_range is not None:
+        bounds['year'] = year_range
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        bounds['latitude'] = (min_lat, max_lat)
+        bounds['longitude'] = (min_lon, max_lon)
+
+    selected = []
+    for i in range(metadata.num_row_groups):
+        rg = metadata.row_group(i)
+        if all(_overlaps(rg.column(names.index(col)).statistics, low, high) for col, (low, high) in bounds.items()):
+            selected.append(i)
+    return selected
+
+
+def read_forecast(input_file, year=None, years=None, bbox=None, columns=None):
+    """Read forecast rows for one year, a (start, end) year range and/or a bbox.
+
+    bbox is (min_lon, min_lat, max_lon, max_lat). Row groups that cannot match
+    are skipped using their statistics; the remaining rows are filtered exactly.
+    """
+    if year is not None:
+        years = (year, year)
+
+    pf = pq.ParquetFile(input_file)
+    row_groups = select_row_groups(pf.metadata, years, bbox)
+    read_cols = None
+    if columns is not None:
+        filter_cols = (['year'] if years is not None else []) + (['latitude', 'longitude'] if bbox is not None else [])
+        read_cols = list(dict.fromkeys(list(columns) + filter_cols))
+
+    if row_groups:
+        df = pl.from_arrow(pf.read_row_groups(row_groups, columns=read_cols))
+    else:
+        df = pl.from_arrow(pf.schema_arrow.empty_table()).select(read_cols or pl.all())
+
+    predicate = pl.lit(True)
+    if years is not None:
+        predicate &= pl.col('year').is_between(years[0], years[1])
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        predicate &= pl.col('latitude').is_between(min_lat, max_lat) & pl.col('longitude').is_between(min_lon, max_lon)
+    df = df.filter(predicate)
+    return df.select(columns) if columns is not None else df
+
+
+def convert_csv(input_file, output_file=None, lat_band_deg=None):
+    input_file = Path(input_file)
+    output_file = output_file or input_file.with_suffix('.parquet')
+    df = pl.read_csv(input_file)
+    write_forecast(df, output_file, lat_band_deg=lat_band_deg)
+    print(f"Converted {input_file} ({input_file.stat().st_size:,} bytes) -> {output_file} ({Path(output_file).stat().st_size:,} bytes)")
+    return output_file
+
+
+if __name__ == "__main__":
+    clean_dir = Path(__file__).resolve().parent.parent / "Dataset" / "cleanData"
+
+    for name in ["woodchuck_forecast_hundreds.csv", "woodchucks_with_wood_volume_future.csv"]:
+        if (clean_dir / name).exists():
+            convert_csv(clean_dir / name)
+        else:
+            print(f"Skipping {name}: file not found")
@@ -1,210 +1,217 @@
 import polars as pl
 import numpy as np
+import zlib
 from datetime import datetime
+from pathlib import Path
 
-def generate_forecast(input_file, output_file, start_year=2018, end_year=2118, noise_level=0.1):
-    print(f"Starting forecast generation at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Reading data from: {input_file}")
 
-    df = pl.read_csv(input_file)
-    print(f"Loaded {len(df)} rows from input file")
+def _write_output(forecast_df, output_file):
+    if str(output_file).endswith('.parquet'):
+        from forecast_store import write_forecast
+        write_forecast(forecast_df, output_file)
+    else:
+        forecast_df.write_csv(output_file)
 
-    locations = df.select(['latitude', 'longitude']).unique()
-    num_locations = len(locations)
-    print(f"Found {num_locations} unique locations")
 
-    years_to_forecast = np.arange(start_year, end_year + 1)
+def _cell_rng(seed, lat, lon):
+    # independent stream per cell so a cell's forecast doesn't depend on which other cells exist
+    return np.random.default_rng([seed, zlib.crc32(f"{lat!r},{lon!r}".encode())])
+
+
+def _location_frame(years_to_forecast, lat, lon, populations, volcf_values, per_woodchuck_values, total_wood_values):
     num_years = len(years_to_forecast)
-    print(f"Generating forecast for {num_years} years ({start_year}-{end_year})")
-    print(f"Adding random noise (±{noise_level*100}% standard deviation)")
-    
-    forecast_data = []
+    return pl.DataFrame({
+        'year': years_to_forecast,
+        'latitude': [lat] * num_years,
+        'longitude': [lon] * num_years,
+        'estimated_woodchuck_population': populations.tolist(),
+        'VOLCF_AC_UNADJ': volcf_values.tolist(),
+        'wood_chucked_per_woodchuck_lbs': per_woodchuck_values.tolist(),
+        'total_wood_chucked_lbs': total_wood_values.tolist(),
+    })
+
+
+def _forecast_flat(location_data, years_to_forecast, noise_level, rng):
+    if location_data.height == 0:
+        return None
+
+    num_years = len(years_to_forecast)
+    latest = location_data.tail(1).row(0, named=True)
+
+    base_population = latest['estimated_woodchuck_population']
+    base_volcf = latest['VOLCF_AC_UNADJ']
+    base_per_woodchuck = latest['wood_chucked_per_woodchuck_lbs']
+
+    population_noise = rng.normal(1.0, noise_level, num_years)
+    volcf_noise = rng.normal(1.0, noise_level, num_years)
+    per_woodchuck_noise = rng.normal(1.0, noise_level, num_years)
+
+    populations = np.maximum(base_population * population_noise, 1)
+    volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
+    per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
+    total_wood_values = populations * per_woodchuck_values
+
+    return _location_frame(years_to_forecast, latest['latitude'], latest['longitude'],
+                           populations, volcf_values, per_woodchuck_values, total_wood_values)
+
+
+def _forecast_growth(location_data, years_to_forecast, noise_level, rng):
+    num_years = len(years_to_forecast)
+
+    if location_data.height >= 2:
+        location_rows = location_data.to_dicts()
+
+        first_row = location_rows[0]
+        latest_row = location_rows[-1]
+
+        base_year = first_row['year']
+        final_year = latest_row['year']
+        years_span = final_year - base_year
+
+        base_population = first_row['estimated_woodchuck_population']
+        final_population = latest_row['estimated_woodchuck_population']
+
+        if years_span > 0 and base_population > 0:
+            growth_rate = (final_population / base_population) ** (1 / years_span)
+        else:
+            growth_rate = 1.0
+
+        years_from_latest = years_to_forecast - final_year
+        projected_populations = final_population * (growth_rate ** years_from_latest)
+
+        population_noise = rng.normal(1.0, noise_level, num_years)
+        projected_populations = np.maximum(projected_populations * population_noise, 1)
+
+        base_per_woodchuck = latest_row['wood_chucked_per_woodchuck_lbs']
+        per_woodchuck_noise = rng.normal(1.0, noise_level, num_years)
+        per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
+
+        projected_wood = projected_populations * per_woodchuck_values
+
+        base_volcf = latest_row['VOLCF_AC_UNADJ']
+        volcf_noise = rng.normal(1.0, noise_level, num_years)
+        volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
+
+        return _location_frame(years_to_forecast, latest_row['latitude'], latest_row['longitude'],
+                               projected_populations, volcf_values, per_woodchuck_values, projected_wood)
+    elif location_data.height == 1:
+        latest = location_data.row(0, named=True)
+
+        base_population = latest['estimated_woodchuck_population']
+        base_per_woodchuck = latest['wood_chucked_per_woodchuck_lbs']
+        base_volcf = latest['VOLCF_AC_UNADJ']
+
+        population_noise = rng.normal(1.0, noise_level, num_years)
+        populations = np.maximum(base_population * population_noise, 1)
+
+        per_woodchuck_noise = rng.normal(1.0, noise_level, num_years)
+        per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
+
+        volcf_noise = rng.normal(1.0, noise_level, num_years)
+        volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
+
+        total_wood_values = populations * per_woodchuck_values
+
+        return _location_frame(years_to_forecast, latest['latitude'], latest['longitude'],
+                               populations, volcf_values, per_woodchuck_values, total_wood_values)
+
+    return None
+
+
+def _flat_input_rows(location_data):
+    return location_data.tail(1)
+
+
+def _growth_input_rows(location_data):
+    if location_data.height >= 2:
+        return pl.concat([location_data.head(1), location_data.tail(1)])
+    return location_data
 
-    np.random.seed(42)
 
-    for idx, row in enumerate(locations.iter_rows(named=True)):
-        if (idx + 1) % 100 == 0:
+# model name -> (per-location forecast, rows of the location's history the forecast reads)
+MODELS = {
+    'flat': (_forecast_flat, _flat_input_rows),
+    'growth': (_forecast_growth, _growth_input_rows),
+}
+
+
+def partition_locations(df):
+    return df.sort('year').partition_by(['latitude', 'longitude'], as_dict=True, maintain_order=True)
+
+
+def forecast_locations(locations, model, years_to_forecast, noise_level, seed=42, verbose=True):
+    forecast_fn, _ = MODELS[model]
+    forecast_data = []
+    num_locations = len(locations)
+
+    for idx, ((lat, lon), location_data) in enumerate(sorted(locations.items())):
+        if verbose and (idx + 1) % 100 == 0:
             print(f"Processing location {idx + 1}/{num_locations}...")
-        
-        lat, lon = row['latitude'], row['longitude']
-
-        location_data = df.filter(
-            (pl.col('latitude') == lat) & (pl.col('longitude') == lon)
-        ).sort('year')
-        
-        if location_data.height > 0:
-            latest = location_data.tail(1).row(0, named=True)
-
-            base_population = latest['estimated_woodchuck_population']
-            base_volcf = latest['VOLCF_AC_UNADJ']
-            base_per_woodchuck = latest['wood_chucked_per_woodchuck_lbs']
-            base_total_wood = latest['total_wood_chucked_lbs']
-
-            population_noise = np.random.normal(1.0, noise_level, num_years)
-            volcf_noise = np.random.normal(1.0, noise_level, num_years)
-            per_woodchuck_noise = np.random.normal(1.0, noise_level, num_years)
-
-            populations = np.maximum(base_population * population_noise, 1)
-            volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
-            per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
-            total_wood_values = populations * per_woodchuck_values
-
-            location_forecast = pl.DataFrame({
-                'year': years_to_forecast,
-                'latitude': [lat] * num_years,
-                'longitude': [lon] * num_years,
-                'estimated_woodchuck_population': populations.tolist(),
-                'VOLCF_AC_UNADJ': volcf_values.tolist(),
-                'wood_chucked_per_woodchuck_lbs': per_woodchuck_values.tolist(),
-                'total_wood_chucked_lbs': total_wood_values.tolist(),
-            })
-            
+
+        location_forecast = forecast_fn(location_data, years_to_forecast, noise_level, _cell_rng(seed, lat, lon))
+        if location_forecast is not None:
             forecast_data.append(location_forecast)
-    
-    print(f"Concatenating {len(forecast_data)} location forecasts...")
 
-    forecast_df = pl.concat(forecast_data)
+    return forecast_data
+
+
+def _generate(model, input_file, output_file, start_year, end_year, noise_level, seed, read_csv=pl.read_csv):
+    print(f"Reading data from: {input_file}")
+
+    df = read_csv(input_file)
+    print(f"Loaded {len(df)} rows from input file")
+
+    forecast_df = forecast_frame(df, model, start_year, end_year, noise_level, seed)
 
-    print(f"Sorting by year...")
-    forecast_df = forecast_df.sort(['year', 'latitude', 'longitude'])
-    
     print(f"Writing {len(forecast_df)} forecast rows to: {output_file}")
-    forecast_df.write_csv(output_file)
-    
+    _write_output(forecast_df, output_file)
+
     print(f"✓ Forecast generation complete at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"✓ Total rows generated: {len(forecast_df):,}")
     print(f"✓ Output file: {output_file}")
-    
+
     return forecast_df
 
 
-def generate_forecast_with_growth(input_file, output_file, start_year=2018, end_year=2518, noise_level=0.1):
-    print(f"Starting forecast generation with growth model at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Reading data from: {input_file}")
-    
-    df = pl.read_csv(input_file)
-    print(f"Loaded {len(df)} rows from input file")
-
-    locations = df.select(['latitude', 'longitude']).unique()
+def forecast_frame(df, model='growth', start_year=2018, end_year=2518, noise_level=0.1, seed=42):
+    """Forecast every location of an in-memory history frame without touching disk."""
+    locations = partition_locations(df)
     num_locations = len(locations)
     print(f"Found {num_locations} unique locations")
-    
+
     years_to_forecast = np.arange(start_year, end_year + 1)
     num_years = len(years_to_forecast)
-    print(f"Generating forecast with growth model for {num_years} years ({start_year}-{end_year})")
+    print(f"Generating forecast for {num_years} years ({start_year}-{end_year})")
     print(f"Adding random noise (±{noise_level*100}% standard deviation)")
-    
-    forecast_data = []
 
-    np.random.seed(42)
-    
-    for idx, row in enumerate(locations.iter_rows(named=True)):
-        if (idx + 1) % 100 == 0:
-            print(f"Processing location {idx + 1}/{num_locations}...")
-        
-        lat, lon = row['latitude'], row['longitude']
-
-        location_data = df.filter(
-            (pl.col('latitude') == lat) & (pl.col('longitude') == lon)
-        ).sort('year')
-        
-        if location_data.height >= 2:
-            location_rows = location_data.to_dicts()
-            
-            first_row = location_rows[0]
-            latest_row = location_rows[-1]
-            
-            base_year = first_row['year']
-            final_year = latest_row['year']
-            years_span = final_year - base_year
-            
-            base_population = first_row['estimated_woodchuck_population']
-            final_population = latest_row['estimated_woodchuck_population']
-
-            if years_span > 0 and base_population > 0:
-                growth_rate = (final_population / base_population) ** (1 / years_span)
-            else:
-                growth_rate = 1.0
-
-            years_from_latest = years_to_forecast - final_year
-            projected_populations = final_population * (growth_rate ** years_from_latest)
-
-            population_noise = np.random.normal(1.0, noise_level, num_years)
-            projected_populations = np.maximum(projected_populations * population_noise, 1)
-
-            base_per_woodchuck = latest_row['wood_chucked_per_woodchuck_lbs']
-            per_woodchuck_noise = np.random.normal(1.0, noise_level, num_years)
-            per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
-
-            projected_wood = projected_populations * per_woodchuck_values
-
-            base_volcf = latest_row['VOLCF_AC_UNADJ']
-            volcf_noise = np.random.normal(1.0, noise_level, num_years)
-            volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
-            
-            location_forecast = pl.DataFrame({
-                'year': years_to_forecast,
-                'latitude': [lat] * num_years,
-                'longitude': [lon] * num_years,
-                'estimated_woodchuck_population': projected_populations.tolist(),
-                'VOLCF_AC_UNADJ': volcf_values.tolist(),
-                'wood_chucked_per_woodchuck_lbs': per_woodchuck_values.tolist(),
-                'total_wood_chucked_lbs': projected_wood.tolist(),
-            })
-            
-            forecast_data.append(location_forecast)
-        elif location_data.height == 1:
-            latest = location_data.row(0, named=True)
-            
-            base_population = latest['estimated_woodchuck_population']
-            base_per_woodchuck = latest['wood_chucked_per_woodchuck_lbs']
-            base_volcf = latest['VOLCF_AC_UNADJ']
-
-            population_noise = np.random.normal(1.0, noise_level, num_years)
-            populations = np.maximum(base_population * population_noise, 1)
-            
-            per_woodchuck_noise = np.random.normal(1.0, noise_level, num_years)
-            per_woodchuck_values = np.maximum(base_per_woodchuck * per_woodchuck_noise, 0.1)
-            
-            volcf_noise = np.random.normal(1.0, noise_level, num_years)
-            volcf_values = np.maximum(base_volcf * volcf_noise, 0.1)
-            
-            total_wood_values = populations * per_woodchuck_values
-            
-            location_forecast = pl.DataFrame({
-                'year': years_to_forecast,
-                'latitude': [lat] * num_years,
-                'longitude': [lon] * num_years,
-                'estimated_woodchuck_population': populations.tolist(),
-                'VOLCF_AC_UNADJ': volcf_values.tolist(),
-                'wood_chucked_per_woodchuck_lbs': per_woodchuck_values.tolist(),
-                'total_wood_chucked_lbs': total_wood_values.tolist(),
-            })
-            
-            forecast_data.append(location_forecast)
-    
+    forecast_data = forecast_locations(locations, model, years_to_forecast, noise_level, seed)
+
     print(f"Concatenating {len(forecast_data)} location forecasts...")
     forecast_df = pl.concat(forecast_data)
-    
+
     print(f"Sorting by year...")
-    forecast_df = forecast_df.sort(['year', 'latitude', 'longitude'])
-    
-    print(f"Writing {len(forecast_df)} forecast rows to: {output_file}")
-    forecast_df.write_csv(output_file)
-    
-    print(f"✓ Forecast generation complete at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"✓ Total rows generated: {len(forecast_df):,}")
-    print(f"✓ Output file: {output_file}")
-    
-    return forecast_df
+    return forecast_df.sort(['year', 'latitude', 'longitude'])
+
+
+def generate_forecast(input_file, output_file, start_year=2018, end_year=2118, noise_level=0.1, seed=42,
+                      read_csv=pl.read_csv):
+    print(f"Starting forecast generation at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return _generate('flat', input_file, output_file, start_year, end_year, noise_level, seed, read_csv)
+
+
+def generate_forecast_with_growth(input_file, output_file, start_year=2018, end_year=2518, noise_level=0.1, seed=42,
+                                  read_csv=pl.read_csv):
+    print(f"Starting forecast generation with growth model at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return _generate('growth', input_file, output_file, start_year, end_year, noise_level, seed, read_csv)
+
 
+if __name__ == "__main__":
+    clean_dir = Path(__file__).resolve().parent.parent / "Dataset" / "cleanData"
 
-if __name__ == "__main__":    
     generate_forecast_with_growth(
-        input_file='Dataset/cleanData/woodchucks_with_wood_volume.csv',
-        output_file='Dataset/cleanData/woodchuck_forecast_hundreds.csv',
+        input_file=clean_dir / "woodchucks_with_wood_volume.csv",
+        output_file=clean_dir / "woodchuck_forecast_hundreds.csv",
         start_year=2018,
         end_year=2518,
         noise_level=0.50
     )
-    
\ No newline at end of file
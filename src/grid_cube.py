@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class GridCube:
+    """Variables on a regular (year, lat_idx, lon_idx) grid.
+
+    Each variable is stored either dense (a float array, optionally a .npy
+    memmap, NaN for empty cells) or sparse as a year-major CSR layout: row
+    pointers per year over flat lat_idx * n_lon + lon_idx cell indices. The
+    layout is picked per cube from the share of occupied cells.
+    """
+
+    def __init__(self, years, lat0, lon0, n_lat, n_lon, resolution=0.1, layout='dense'):
+        self.years = np.asarray(years, dtype=int)
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.n_lat = int(n_lat)
+        self.n_lon = int(n_lon)
+        self.resolution = float(resolution)
+        self.layout = layout
+        self.variables = {}
+
+    @property
+    def shape(self):
+        return (len(self.years), self.n_lat, self.n_lon)
+
+    @property
+    def latitudes(self):
+        return np.round(self.lat0 + np.arange(self.n_lat) * self.resolution, 6)
+
+    @property
+    def longitudes(self):
+        return np.round(self.lon0 + np.arange(self.n_lon) * self.resolution, 6)
+
+    @classmethod
+    def from_long(cls, df, value_cols, resolution=0.1, year_col='year', lat_col='latitude', lon_col='longitude',
+                  layout=None, dense_threshold=0.25, memmap_dir=None):
+        """Build a cube from (year, lat, lon, value...) rows; each cell-year must appear once."""
+        if df[[year_col, lat_col, lon_col]].isna().any(axis=None):
+            raise ValueError("Long-format input has rows without a year or coordinates")
+        if df.duplicated([year_col, lat_col, lon_col]).any():
+            raise ValueError("Long-format input has more than one row per year and cell")
+
+        lat = df[lat_col].to_numpy(float)
+        lon = df[lon_col].to_numpy(float)
+        years = np.unique(df[year_col].to_numpy(int))
+        lat0, lon0 = lat.min(), lon.min()
+        n_lat = int(np.rint((lat.max() - lat0) / resolution)) + 1
+        n_lon = int(np.rint((lon.max() - lon0) / resolution)) + 1
+        occupancy = len(df) / (len(years) * n_lat * n_lon)
+        if layout is None:
+            layout = 'dense' if occupancy >= dense_threshold else 'sparse'
+
+        cube = cls(years, lat0, lon0, n_lat, n_lon, resolution, layout)
+        year_idx, lat_idx, lon_idx = cube.cell_index(df, year_col, lat_col, lon_col)
+        flat = lat_idx * n_lon + lon_idx
+
+        for col in value_cols:
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(float)
+            if layout == 'dense':
+                arr = cube._allocate(col, memmap_dir)
+                arr[year_idx, lat_idx, lon_idx] = values
+                cube.variables[col] = arr
+            else:
+                order = np.lexsort((flat, year_idx))
+                indptr = np.searchsorted(year_idx[order], np.arange(len(years) + 1))
+                cube.variables[col] = {'indptr': indptr, 'indices': flat[order], 'data': values[order]}
+
+        return cube
+
+    def _allocate(self, name, memmap_dir=None):
+        if memmap_dir is None:
+            return np.full(self.shape, np.nan)
+        Path(memmap_dir).mkdir(parents=True, exist_ok=True)
+        arr = np.lib.format.open_memmap(Path(memmap_dir) / f"{name}.npy", mode='w+', dtype=float, shape=self.shape)
+        arr[:] = np.nan
+        return arr
+
+    def cell_index(self, df, year_col='year', lat_col='latitude', lon_col='longitude'):
+        """(year_idx, lat_idx, lon_idx) arrays locating each row of df in the cube."""
+        year_idx = np.searchsorted(self.years, df[year_col].to_numpy(int))
+        lat_idx = np.rint((df[lat_col].to_numpy(float) - self.lat0) / self.resolution).astype(np.int64)
+        lon_idx = np.rint((df[lon_col].to_numpy(float) - self.lon0) / self.resolution).astype(np.int64)
+        return year_idx, lat_idx, lon_idx
+
+    def dense(self, name):
+        """Dense (year, lat, lon) array of a variable; sparse variables are expanded."""
+        var = self.variables[name]
+        if not isinstance(var, dict):
+            return var
+        arr = np.full((len(self.years), self.n_lat * self.n_lon), np.nan)
+        rows = np.repeat(np.arange(len(self.years)), np.diff(var['indptr']))
+        arr[rows, var['indices']] = var['data']
+        return arr.reshape(self.shape)
+
+    def presence(self, name):
+        """Boolean (year, lat, lon) mask of cells that hold a value (stored entries for sparse variables)."""
+        var = self.variables[name]
+        if not isinstance(var, dict):
+            return ~np.isnan(var)
+        mask = np.zeros((len(self.years), self.n_lat * self.n_lon), dtype=bool)
+        mask[np.repeat(np.arange(len(self.years)), np.diff(var['indptr'])), var['indices']] = True
+        return mask.reshape(self.shape)
+
+    def to_long(self, names=None, year_col='year', lat_col='latitude', lon_col='longitude'):
+        """Occupied cells back to long format, sorted by year, latitude, longitude."""
+        names = list(names or self.variables)
+        present = np.zeros(self.shape, dtype=bool)
+        for n in names:
+            present |= self.presence(n)
+
+        y, i, j = np.nonzero(present)
+        out = pd.DataFrame({
+            year_col: self.years[y],
+            lat_col: self.latitudes[i],
+            lon_col: self.longitudes[j],
+        })
+        for n in names:
+            out[n] = self.dense(n)[y, i, j]
+        return out
+
+    def window_sum(self, name, radius=1):
+        """Sum over cells within `radius` grid steps (the cell included), per year; empty cells add 0."""
+        arr = self.dense(name)
+        padded = np.pad(np.where(np.isnan(arr), 0.0, arr), ((0, 0), (radius, radius), (radius, radius)))
+        total = np.zeros(arr.shape)
+        for di in range(2 * radius + 1):
+            for dj in range(2 * radius + 1):
+                total += padded[:, di:di + self.n_lat, dj:dj + self.n_lon]
+        return total
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'years': self.years.tolist(), 'lat0': self.lat0, 'lon0': self.lon0,
+            'n_lat': self.n_lat, 'n_lon': self.n_lon, 'resolution': self.resolution,
+            'layout': self.layout, 'variables': list(self.variables),
+        }
+        for name, var in self.variables.items():
+            if isinstance(var, dict):
+                np.savez_compressed(directory / f"{name}.npz", **var)
+            elif not (isinstance(var, np.memmap) and Path(var.filename) == (directory / f"{name}.npy").resolve()):
+                np.save(directory / f"{name}.npy", var)
+            else:
+                var.flush()
+        with open(directory / "cube.json", 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        directory = Path(directory)
+        with open(directory / "cube.json") as f:
+            meta = json.load(f)
+        cube = cls(meta['years'], meta['lat0'], meta['lon0'], meta['n_lat'], meta['n_lon'],
+                   meta['resolution'], meta['layout'])
+        for name in meta['variables']:
+            if (directory / f"{name}.npz").exists():
+                with np.load(directory / f"{name}.npz") as z:
+                    cube.variables[name] = {k: z[k] for k in ('indptr', 'indices', 'data')}
+            else:
+                cube.variables[name] = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+        return cube
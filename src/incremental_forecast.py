@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from generate_forcecast_polars import MODELS, _write_output, forecast_locations, partition_locations
+
+
+def fingerprint_path(output_file):
+    return Path(f"{output_file}.fingerprints.csv")
+
+
+def cell_fingerprints(locations, model, start_year, end_year, noise_level, seed):
+    _, input_rows_fn = MODELS[model]
+    params = repr((model, start_year, end_year, noise_level, seed))
+
+    rows = []
+    for (lat, lon), location_data in locations.items():
+        h = hashlib.sha1(params.encode())
+        # repr of the row tuples keeps full float precision
+        h.update(repr(input_rows_fn(location_data).rows()).encode())
+        rows.append({'latitude': lat, 'longitude': lon, 'fingerprint': h.hexdigest()})
+
+    return pl.DataFrame(rows, schema={'latitude': pl.Float64, 'longitude': pl.Float64, 'fingerprint': pl.Utf8})
+
+
+def _read_output(output_file):
+    if str(output_file).endswith('.parquet'):
+        return pl.read_parquet(output_file)
+    return pl.read_csv(output_file)
+
+
+def update_forecast(input_file, output_file, model='growth', start_year=2018, end_year=2518, noise_level=0.1, seed=42,
+                    read_csv=pl.read_csv):
+    """Regenerate only the locations whose forecast inputs changed since the last run.
+
+    Per-cell fingerprints of the rows the model reads, the parameters and the
+    seed are kept next to the output. Unchanged locations are carried over from
+    the existing output untouched; changed or new ones are regenerated and
+    locations no longer in the input are dropped.
+    """
+    print(f"Starting incremental forecast ({model}) at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    df = read_csv(input_file)
+    locations = partition_locations(df)
+    current = cell_fingerprints(locations, model, start_year, end_year, noise_level, seed)
+
+    fp_file = fingerprint_path(output_file)
+    if Path(output_file).exists() and fp_file.exists():
+        previous = pl.read_csv(fp_file)
+        existing = _read_output(output_file)
+    else:
+        previous = current.clear()
+        existing = None
+
+    unchanged = current.join(previous, on=['latitude', 'longitude', 'fingerprint'], how='semi')
+    changed = current.join(unchanged, on=['latitude', 'longitude'], how='anti')
+    print(f"{len(changed)} of {len(current)} locations changed")
+
+    changed_keys = set(changed.select(['latitude', 'longitude']).iter_rows())
+    years_to_forecast = np.arange(start_year, end_year + 1)
+    forecast_data = forecast_locations(
+        {k: v for k, v in locations.items() if k in changed_keys}, model, years_to_forecast, noise_level, seed
+    )
+
+    parts = [pl.concat(forecast_data)] if forecast_data else []
+    if existing is not None:
+        kept = existing.join(unchanged.select(['latitude', 'longitude']), on=['latitude', 'longitude'], how='semi')
+        parts = [kept] + [p.select(kept.columns).cast(kept.schema) for p in parts]
+
+    forecast_df = pl.concat(parts).sort(['year', 'latitude', 'longitude'])
+
+    print(f"Writing {len(forecast_df)} forecast rows to: {output_file}")
+    _write_output(forecast_df, output_file)
+    current.write_csv(fp_file)
+
+    print(f"✓ Incremental forecast complete at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return forecast_df
+
+
+if __name__ == "__main__":
+    clean_dir = Path(__file__).resolve().parent.parent / "Dataset" / "cleanData"
+
+    update_forecast(
+        input_file=clean_dir / "woodchucks_with_wood_volume.csv",
+        output_file=clean_dir / "woodchuck_forecast_hundreds.csv",
+        model='growth',
+        start_year=2018,
+        end_year=2518,
+        noise_level=0.50
+    )
@@ -4,6 +4,9 @@ import math
 import numpy as np
 import pandas as pd
 
+from grid_cube import GridCube
+from partitioned_io import read_partitions, split_by, write_partitions
+
 
 def _find_column(cols, candidates):
     cols_l = [c.lower() for c in cols]
@@ -14,15 +17,13 @@ def _find_column(cols, candidates):
     return None
 
 
-def integrate_data(dataset_root: Path | str | None = None,
-                   detection_rate: float = 0.02,
-                   estimation_mode: str = "hybrid",
-                   woodchuck_density_per_km2: float | None = None,
-                   woodchuck_per_person_ratio: float = 0.05,
-                   calibration_year: int | None = None,
-                   calibration_total: float | None = None,
-                   calibration_mode: str = "sightings"):
+def load_base_frame(dataset_root: Path | str | None = None, read_csv=pd.read_csv):
+    """Sightings merged with population per grid cell, before any estimation parameters apply.
 
+    Returns (merged, sight_col, year_col, clean_dir), or None if the sightings
+    files lack coordinate or count columns. read_csv lets a caller serve the
+    input files from memory (e.g. the cli worker's DatasetCache).
+    """
     dataset_root = Path(dataset_root) if dataset_root else Path(__file__).resolve().parent.parent / "Dataset"
     clean_dir = dataset_root / "cleanData"
     pop_file = clean_dir / "population_density_by_coords.csv"
@@ -58,10 +59,7 @@ def integrate_data(dataset_root: Path | str | None = None,
     sightings_files = sorted(clean_dir.glob("sightings_by_grid_per_year_*.csv"))
 
 
-    dfs = []
-    for f in sightings_files:
-        dfs.append(pd.read_csv(f))
-    sightings = pd.concat(dfs, ignore_index=True)
+    sightings = read_partitions(sightings_files, read_csv=read_csv)
 
     lat_s_col = _find_column(sightings.columns, ["latitudeGrid", "lat", "latitude"])
     lon_s_col = _find_column(sightings.columns, ["longitudeGrid", "long", "longitude"])
@@ -71,7 +69,7 @@ def integrate_data(dataset_root: Path | str | None = None,
 
     if not all([lat_s_col, lon_s_col, sight_col]):
 
-        return
+        return None
 
     group_cols = [lat_s_col, lon_s_col]
     if year_col:
@@ -109,7 +107,7 @@ def integrate_data(dataset_root: Path | str | None = None,
         if not Path(p).exists():
             continue
         try:
-            df_try = pd.read_csv(p)
+            df_try = read_csv(p)
         except Exception:
             continue
         lat_c, lon_c, pop_c = _valid_pop_df(df_try)
@@ -124,7 +122,7 @@ def integrate_data(dataset_root: Path | str | None = None,
 
         for p in sorted({str(x) for x in candidates if Path(x).exists()}):
             try:
-                cols = pd.read_csv(p, nrows=0).columns.tolist()
+                cols = read_csv(p, nrows=0).columns.tolist()
             except Exception:
                 cols = ["<unreadable>"]
   
@@ -156,7 +154,7 @@ def integrate_data(dataset_root: Path | str | None = None,
         proxy = clean_dir / "population_data_woodchucks.csv"
         if proxy.exists():
             try:
-                df_proxy = pd.read_csv(proxy)
+                df_proxy = read_csv(proxy)
                 proxy_year_col = _find_column(df_proxy.columns, ["year", "yr"])
                 proxy_val_col = _find_column(df_proxy.columns, ["harvest", "index", "value", "total", "count"])
                 if proxy_year_col and proxy_val_col:
@@ -222,95 +220,138 @@ def integrate_data(dataset_root: Path | str | None = None,
     merged["grid_area_km2"] = merged["latitude"].apply(grid_area_km2)
 
 
-    def est_pop(row):
-        sc = row.get(sight_col)
-        area = row.get("grid_area_km2")
-
-        if estimation_mode == "density":
-            if woodchuck_density_per_km2 is None or pd.isna(area):
-                return pd.NA
-            return float(woodchuck_density_per_km2) * float(area)
+    return merged, sight_col, year_col, clean_dir
+
+
+def _neighbour_mean_by_year(merged: pd.DataFrame) -> np.ndarray:
+    """Mean estimate over same-year rows within one 0.1 cell, on the year x lat x lon grid.
+
+    Rows sharing a cell each count, as in the self-join this replaces; rows
+    without a year or coordinates get NaN.
+    """
+    keys = ["year", "latitude", "longitude"]
+    located = merged[keys].notna().all(axis=1).to_numpy()
+    if not located.any():
+        return np.full(len(merged), np.nan)
+
+    cells = merged[located].groupby(keys, as_index=False).agg(
+        estimate_total=("estimated_woodchuck_population", "sum"),
+        estimate_count=("estimated_woodchuck_population", "count"),
+    )
+    cube = GridCube.from_long(cells, ["estimate_total", "estimate_count"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        window_mean = cube.window_sum("estimate_total") / cube.window_sum("estimate_count")
+
+    out = np.full(len(merged), np.nan)
+    out[located] = window_mean[cube.cell_index(merged[located])]
+    return out
+
+
+def _param_vector(values, size):
+    arr = np.array([np.nan if v is None else v for v in np.atleast_1d(np.asarray(values, dtype=object))], dtype=float)
+    return np.broadcast_to(arr, (size,))
+
+
+def estimate_populations(merged: pd.DataFrame,
+                         sight_col: str,
+                         detection_rate,
+                         estimation_mode,
+                         woodchuck_density_per_km2,
+                         woodchuck_per_person_ratio):
+    """Population estimates for every row under P parameter settings at once.
+
+    Each parameter is a scalar or a length-P sequence (None allowed where the
+    scalar form allows it). Returns (by_sightings, by_density, estimate) as
+    (rows, P) float arrays with NaN where no estimate is possible.
+    """
+    modes = np.atleast_1d(np.asarray(estimation_mode, dtype=object))
+    size = max(len(np.atleast_1d(np.asarray(p, dtype=object))) for p in
+               [detection_rate, modes, woodchuck_density_per_km2, woodchuck_per_person_ratio])
+    modes = np.broadcast_to(modes, (size,))
+    rate = _param_vector(detection_rate, size)
+    density = _param_vector(woodchuck_density_per_km2, size)
+    ratio = _param_vector(woodchuck_per_person_ratio, size)
+
+    sc = pd.to_numeric(merged[sight_col], errors="coerce").to_numpy(float)[:, None]
+    area = merged["grid_area_km2"].to_numpy(float)[:, None]
+    people = pd.to_numeric(merged["population"], errors="coerce").to_numpy(float)[:, None]
+
+    valid_rate = ~np.isnan(rate) & (np.nan_to_num(rate) > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_sightings = np.where(valid_rate[None, :], sc / np.where(valid_rate, rate, 1.0)[None, :], np.nan)
+
+    # fall back from measured density, to people x ratio, to a flat density
+    by_density = density[None, :] * area
+    by_density = np.where(~np.isnan(people) & ~np.isnan(ratio)[None, :], people * ratio[None, :], by_density)
+    if "woodchuck_density" in merged.columns:
+        wd = pd.to_numeric(merged["woodchuck_density"], errors="coerce").to_numpy(float)[:, None]
+        by_density = np.where(~np.isnan(wd) & ~np.isnan(area), wd * area, by_density)
+
+    is_density = (modes == "density")[None, :]
+    is_hybrid = (modes == "hybrid")[None, :]
+    hybrid = np.where(np.isnan(by_density), by_sightings, by_density)
+    estimate = np.where(is_density, by_density, np.where(is_hybrid, hybrid, by_sightings))
+
+    return by_sightings, by_density, estimate
+
+
+def calibration_factors(merged: pd.DataFrame,
+                        by_sightings: np.ndarray,
+                        by_density: np.ndarray,
+                        calibration_year,
+                        calibration_total,
+                        calibration_mode):
+    """Per-setting factor scaling the estimates so calibration_year sums to calibration_total (NaN if unset)."""
+    size = by_sightings.shape[1]
+    year = _param_vector(calibration_year, size)
+    total = _param_vector(calibration_total, size)
+    modes = np.broadcast_to(np.atleast_1d(np.asarray(calibration_mode, dtype=object)), (size,))
 
-        if estimation_mode == "hybrid":
-            if woodchuck_density_per_km2 is not None and not pd.isna(area):
-                return float(woodchuck_density_per_km2) * float(area)
-   
-        try:
-            if pd.isna(sc):
-                return pd.NA
-            if detection_rate is None or detection_rate <= 0:
-                return pd.NA
-            return float(sc) / float(detection_rate)
-        except Exception:
-            return pd.NA
+    if "year" in merged.columns:
+        in_year = merged["year"].to_numpy(float)[:, None] == year[None, :]
+    else:
+        in_year = np.ones((len(merged), size), dtype=bool)
 
-    def est_by_sight(row):
-        sc = row.get(sight_col)
-        try:
-            if pd.isna(sc) or detection_rate is None or detection_rate <= 0:
-                return pd.NA
-            return float(sc) / float(detection_rate)
-        except Exception:
-            return pd.NA
+    base = np.where((modes == "density")[None, :], by_density, by_sightings)
+    sum_est = np.empty(size)
+    for j in range(size):
+        # sequential sum in row order, so factors match the earlier row-wise implementation exactly
+        col = base[in_year[:, j], j]
+        sum_est[j] = sum(col[~np.isnan(col)].tolist())
 
-    def est_by_density(row):
-   
-        area = row.get("grid_area_km2")
-       
-        wd = row.get("woodchuck_density")
-        if pd.notna(wd) and pd.notna(area):
-            try:
-                return float(wd) * float(area)
-            except Exception:
-                pass
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = total / sum_est
+    return np.where(~np.isnan(year) & ~np.isnan(total) & (sum_est > 0), factor, np.nan)
 
-        people = row.get("population")
-        if pd.notna(people) and woodchuck_per_person_ratio is not None:
-            try:
-                return float(people) * float(woodchuck_per_person_ratio)
-            except Exception:
-                pass
 
-        if woodchuck_density_per_km2 is not None and pd.notna(area):
-            try:
-                return float(woodchuck_density_per_km2) * float(area)
-            except Exception:
-                pass
-
-        return pd.NA
-
-    merged["estimated_by_sightings"] = merged.apply(est_by_sight, axis=1)
-    merged["estimated_by_density"] = merged.apply(est_by_density, axis=1)
+def integrate_data(dataset_root: Path | str | None = None,
+                   detection_rate: float = 0.02,
+                   estimation_mode: str = "hybrid",
+                   woodchuck_density_per_km2: float | None = None,
+                   woodchuck_per_person_ratio: float = 0.05,
+                   calibration_year: int | None = None,
+                   calibration_total: float | None = None,
+                   calibration_mode: str = "sightings",
+                   write_outputs: bool = True,
+                   read_csv=pd.read_csv):
 
-    
-    if estimation_mode == "density":
-        merged["estimated_woodchuck_population"] = merged["estimated_by_density"]
-    elif estimation_mode == "hybrid":
-   
-        merged["estimated_woodchuck_population"] = merged.apply(
-            lambda r: r["estimated_by_density"] if pd.notna(r["estimated_by_density"]) else r["estimated_by_sightings"],
-            axis=1,
-        )
+    base = load_base_frame(dataset_root, read_csv)
+    if base is None:
+        return
+    merged, sight_col, year_col, clean_dir = base
+
+    by_sightings, by_density, estimate = estimate_populations(
+        merged, sight_col, detection_rate, estimation_mode, woodchuck_density_per_km2, woodchuck_per_person_ratio
+    )
+    merged["estimated_by_sightings"] = by_sightings[:, 0]
+    merged["estimated_by_density"] = by_density[:, 0]
+    merged["estimated_woodchuck_population"] = estimate[:, 0]
+
+    factor = calibration_factors(merged, by_sightings, by_density, calibration_year, calibration_total, calibration_mode)[0]
+    if np.isnan(factor):
+        merged["estimated_woodchuck_population_calibrated"] = pd.NA
     else:
-        merged["estimated_woodchuck_population"] = merged["estimated_by_sightings"]
-
-    merged["estimated_woodchuck_population_calibrated"] = pd.NA
-    if calibration_year is not None and calibration_total is not None:
-
-        if "year" in merged.columns:
-            mask = merged["year"] == int(calibration_year)
-            subset = merged[mask]
-        else:
-            subset = merged
-
-        if calibration_mode == "density":
-            sum_est = subset["estimated_by_density"].dropna().sum()
-        else:
-            sum_est = subset["estimated_by_sightings"].dropna().sum()
-
-        if sum_est and sum_est > 0:
-            factor = float(calibration_total) / float(sum_est)
-            merged["estimated_woodchuck_population_calibrated"] = (merged["estimated_woodchuck_population"].astype(float) * factor)
+        merged["estimated_woodchuck_population_calibrated"] = merged["estimated_woodchuck_population"] * factor
 
 
 
@@ -327,12 +368,7 @@ def integrate_data(dataset_root: Path | str | None = None,
 
     merged = merged.reset_index(drop=True).reset_index()
     if "year" in merged.columns:
-        neigh = merged[["index", "year", "latitude", "longitude", "estimated_woodchuck_population"]].copy()
-        join = neigh.merge(neigh, on="year", suffixes=("_a", "_b"))
-        mask = (join["latitude_a"].sub(join["latitude_b"]).abs() <= 0.1001) & (join["longitude_a"].sub(join["longitude_b"]).abs() <= 0.1001)
-        join = join[mask]
-        neigh_mean = join.groupby("index_a")["estimated_woodchuck_population_b"].mean().reset_index().rename(columns={"index_a": "index", "estimated_woodchuck_population_b": "neighbor_mean_estimate"})
-        merged = merged.merge(neigh_mean, on="index", how="left")
+        merged["neighbor_mean_estimate"] = _neighbour_mean_by_year(merged)
     else:
         neigh = merged[["index", "latitude", "longitude", "estimated_woodchuck_population"]].copy()
         join = neigh.merge(neigh, how="cross", suffixes=("_a", "_b"))
@@ -366,31 +402,48 @@ def integrate_data(dataset_root: Path | str | None = None,
     
     output_df = output_df.dropna(subset=["estimated_woodchuck_population"])
 
+    if not write_outputs:
+        return output_df
+
     combined_path = out_dir / "adjusted_sightings_all_years_minimal.csv"
-    output_df.to_csv(combined_path, index=False)
+    write_jobs = [(output_df, combined_path)]
 
 
     if year_col:
-        years = sorted(merged[year_col].dropna().unique())
-        for y in years:
-            per = merged[merged[year_col] == int(y)][output_cols].copy()
+        for y, per in split_by(merged, year_col, output_cols).items():
             per = per.dropna(subset=["estimated_woodchuck_population"])
             out_path = out_dir / f"adjusted_sightings_by_grid_per_year_{int(y)}_minimal.csv"
-            per.to_csv(out_path, index=False)
+            write_jobs.append((per, out_path))
 
     # create a single aggregated file with rows for each year/lat/lon
+    agg_path = None
     if "year" in merged.columns:
-        agg_cols = ["year", "latitude", "longitude", "estimated_woodchuck_population"]
-        if "estimated_woodchuck_population_calibrated" in merged.columns:
+        # keep the aggregate's historical columns: estimates with missing cells and an
+        # uncalibrated placeholder used to be object columns that sum(numeric_only=True) skipped
+        agg_cols = ["year", "latitude", "longitude"]
+        if merged["estimated_woodchuck_population"].notna().all():
+            agg_cols.append("estimated_woodchuck_population")
+        if not np.isnan(factor):
             agg_cols.append("estimated_woodchuck_population_calibrated")
-        agg_df = merged[[c for c in ["year", "latitude", "longitude", "estimated_woodchuck_population", "estimated_woodchuck_population_calibrated"] if c in merged.columns]].copy()
+        agg_df = merged[agg_cols].copy()
         agg_df = agg_df.groupby(["year", "latitude", "longitude"], dropna=False).sum(numeric_only=True).reset_index()
         agg_path = out_dir / "adjusted_sightings_by_grid_per_year_aggregated.csv"
-        try:
-            agg_df.to_csv(agg_path, index=False)
+        write_jobs.append((agg_df, agg_path))
+
+    failures = write_partitions(write_jobs, index=False)
+
+    agg_error = failures.pop(agg_path, None)
+    if failures:
+        raise next(iter(failures.values()))
+    if agg_path is not None:
+        if agg_error is None:
             print("Saved aggregated per-year file:", agg_path)
-        except PermissionError as e:
-            print(f"Warning: could not write aggregated per-year file {agg_path}: {e}")
+        elif isinstance(agg_error, PermissionError):
+            print(f"Warning: could not write aggregated per-year file {agg_path}: {agg_error}")
+        else:
+            raise agg_error
+
+    return output_df
 
 
 
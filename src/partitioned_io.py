@@ -0,0 +1,48 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+def _default_workers(n_jobs):
+    return max(1, min(n_jobs, (os.cpu_count() or 1) * 4))
+
+
+def read_partitions(paths, max_workers=None, read_csv=pd.read_csv, **read_kwargs):
+    """Read CSV partitions in a thread pool and concatenate them in the order given."""
+    paths = list(paths)
+    if not paths:
+        raise ValueError("No partitions to read")
+
+    with ThreadPoolExecutor(max_workers=max_workers or _default_workers(len(paths))) as pool:
+        frames = list(pool.map(lambda p: read_csv(p, **read_kwargs), paths))
+    return pd.concat(frames, ignore_index=True)
+
+
+def split_by(df, key, columns=None):
+    """Split df into {key value: rows} with one group-by pass, keeping row order within each part."""
+    view = df if columns is None else df[columns]
+    return {k: part for k, part in view.groupby(df[key], sort=True)}
+
+
+def write_partitions(jobs, max_workers=None, **to_csv_kwargs):
+    """Write (frame, path) pairs concurrently.
+
+    Returns {path: exception} for the writes that failed so callers can decide
+    which failures are fatal.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return {}
+
+    def _write(job):
+        frame, path = job
+        try:
+            frame.to_csv(path, **to_csv_kwargs)
+        except Exception as e:
+            return path, e
+        return path, None
+
+    with ThreadPoolExecutor(max_workers=max_workers or _default_workers(len(jobs))) as pool:
+        results = list(pool.map(_write, jobs))
+    return {path: err for path, err in results if err is not None}
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+from coarse_log_data import build_coarse_log_data
+from create_final_dataset import build_final_dataset
+from generate_forcecast_polars import _write_output, forecast_frame
+from integrateInOne import integrate_data
+
+SRC_DIR = Path(__file__).resolve().parent
+
+# stage name -> file the standalone scripts write for it
+EXPORT_NAMES = {
+    'adjusted': "adjusted_sightings_all_years_minimal.csv",
+    'coarse_logs': "coarse_log_data.csv",
+    'final': "woodchucks_with_wood_volume.csv",
+    'forecast': "woodchuck_forecast_hundreds.csv",
+}
+
+
+def _to_arrow(df):
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def run_pipeline(dataset_root=None,
+                 debris_file=None,
+                 county_file=None,
+                 export_dir=None,
+                 forecast_model='growth',
+                 start_year=2018,
+                 end_year=2518,
+                 noise_level=0.5,
+                 seed=42,
+                 forecast_name=EXPORT_NAMES['forecast'],
+                 read_csv=pd.read_csv,
+                 **integrate_kwargs):
+    """Run integrate -> coarse logs -> final dataset -> forecast without intermediate CSVs.
+
+    pandas stages hand Arrow tables to the polars forecast, so numeric
+    columns cross over without copies or text parsing. Returns the Arrow
+    table of every stage; with export_dir set, each stage is also written
+    under the file name its standalone script uses, the forecast under
+    forecast_name (a .parquet name goes through forecast_store).
+    """
+    dataset_root = Path(dataset_root) if dataset_root else SRC_DIR.parent / "Dataset"
+    debris_file = debris_file or dataset_root / "dirtyData" / "PA_DWM_COARSE_WOODY_DEBRIS.csv"
+    county_file = county_file or SRC_DIR / "countyNameCoords" / "coords.json"
+
+    adjusted = integrate_data(dataset_root, write_outputs=False, read_csv=read_csv, **integrate_kwargs)
+    if adjusted is None:
+        raise ValueError("Sightings files are missing latitude, longitude or count columns")
+    print(f"Integrated {len(adjusted)} grid rows")
+
+    coarse_logs = build_coarse_log_data(debris_file, county_file, read_csv=read_csv)
+    final = build_final_dataset(adjusted, coarse_logs)
+    print(f"Joined wood volume onto {len(final)} rows")
+
+    tables = {
+        'adjusted': _to_arrow(adjusted),
+        'coarse_logs': _to_arrow(coarse_logs),
+        'final': _to_arrow(final),
+    }
+
+    forecast = forecast_frame(pl.from_arrow(tables['final']), forecast_model, start_year, end_year, noise_level, seed)
+    tables['forecast'] = forecast.to_arrow()
+
+    if export_dir is not None:
+        export_dir = Path(export_dir)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        for name, table in tables.items():
+            path = export_dir / (forecast_name if name == 'forecast' else EXPORT_NAMES[name])
+            if name == 'forecast':
+                _write_output(pl.from_arrow(table), path)
+            else:
+                table.to_pandas().to_csv(path, index=False)
+            print(f"Exported {name}: {path}")
+
+    return tables
+
+
+if __name__ == "__main__":
+    clean_dir = SRC_DIR.parent / "Dataset" / "cleanData"
+    run_pipeline(export_dir=clean_dir)
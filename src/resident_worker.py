@@ -0,0 +1,132 @@
+import contextlib
+import getpass
+import io
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import traceback
+from pathlib import Path
+
+# per-user socket file; None where the platform has no Unix sockets
+DEFAULT_SOCKET = (Path(tempfile.gettempdir()) / f"woodchuck-cli-{getpass.getuser()}.sock"
+                  if hasattr(socket, 'AF_UNIX') else None)
+
+
+def parse_address(value):
+    """'HOST:PORT' -> (host, port) for a TCP worker; anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return value
+
+
+def _check_loopback(host):
+    if not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+        raise ValueError(f"Refusing non-loopback worker address {host}: the worker runs any command it is sent")
+
+
+def _connect(address):
+    try:
+        if isinstance(address, tuple):
+            _check_loopback(address[0])
+            return socket.create_connection(address)
+
+        # don't hand argv and cwd to a socket someone else put at our path
+        if os.stat(address).st_uid != os.getuid():
+            raise PermissionError(f"Worker socket {address} is owned by another user")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(address))
+        return sock
+    except (FileNotFoundError, ConnectionRefusedError):
+        where = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else address
+        raise ConnectionError(f"No worker listening at {where}; start one with `cli.py serve`") from None
+
+
+def send_request(address, argv):
+    """Run a cli.py command line on a resident worker; returns (ok, captured output).
+
+    Raises ConnectionError when no worker is listening at address.
+    """
+    with _connect(address) as sock:
+        sock.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode() + b'\n')
+        with sock.makefile('rb') as reader:
+            response = json.loads(reader.readline())
+    return response['ok'], response['output']
+
+
+class _TCPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def _make_server(address, handler):
+    if isinstance(address, tuple):
+        _check_loopback(address[0])
+        return _TCPServer(address, handler)
+
+    path = Path(address)
+    if path.is_socket():
+        path.unlink()
+    # create the socket file owner-only so other local users cannot drive the worker
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(path), handler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(path, 0o600)
+    return server
+
+
+def serve(parser, address=DEFAULT_SOCKET):
+    """Answer cli.py command lines one request at a time.
+
+    The worker keeps its imports warm and holds a DatasetCache across
+    requests, so repeated runs skip interpreter startup and CSV parsing.
+    address is a Unix socket path (created 0600) or a (host, port) pair,
+    which must be a loopback address.
+    """
+    from cli import DatasetCache
+
+    cache = DatasetCache(resident=True)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            output = io.StringIO()
+            ok = True
+            worker_cwd = os.getcwd()
+            try:
+                request = json.loads(line)
+                argv = request['argv']
+                # relative paths mean the same thing as they would in the client's shell
+                os.chdir(request.get('cwd', worker_cwd))
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                    args = parser.parse_args(argv)
+                    if args.command == 'serve':
+                        raise ValueError("a worker cannot start another worker")
+                    args.func(args, cache)
+            except SystemExit as e:
+                ok = e.code in (0, None)
+            except Exception:
+                ok = False
+                output.write(traceback.format_exc())
+            finally:
+                os.chdir(worker_cwd)
+
+            self.wfile.write(json.dumps({'ok': ok, 'output': output.getvalue()}).encode() + b'\n')
+
+    with _make_server(address, Handler) as server:
+        where = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else address
+        print(f"Worker listening on {where}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Worker stopped")
+        finally:
+            if not isinstance(address, tuple):
+                Path(address).unlink(missing_ok=True)
@@ -0,0 +1,133 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from integrateInOne import calibration_factors, estimate_populations, load_base_frame
+
+DEFAULT_GRID = {
+    'detection_rate': [0.02],
+    'estimation_mode': ['hybrid'],
+    'woodchuck_density_per_km2': [None],
+    'woodchuck_per_person_ratio': [0.05],
+    'calibration_year': [None],
+    'calibration_total': [None],
+    'calibration_mode': ['sightings'],
+}
+
+_WORKER_BASE = None
+
+
+def _init_worker(base):
+    global _WORKER_BASE
+    _WORKER_BASE = base
+
+
+def _evaluate(scenarios, return_cells):
+    merged, sight_col = _WORKER_BASE
+    by_sightings, by_density, estimate = estimate_populations(
+        merged, sight_col,
+        scenarios['detection_rate'].tolist(),
+        scenarios['estimation_mode'].tolist(),
+        scenarios['woodchuck_density_per_km2'].tolist(),
+        scenarios['woodchuck_per_person_ratio'].tolist(),
+    )
+    factor = calibration_factors(
+        merged, by_sightings, by_density,
+        scenarios['calibration_year'].tolist(),
+        scenarios['calibration_total'].tolist(),
+        scenarios['calibration_mode'].tolist(),
+    )
+    calibrated = estimate * factor[None, :]
+
+    # per-year totals for every scenario in one pass: (years, rows) @ (rows, scenarios)
+    years, year_idx = np.unique(merged['year'].to_numpy(int), return_inverse=True)
+    membership = np.zeros((len(years), len(merged)))
+    membership[year_idx, np.arange(len(merged))] = 1.0
+    totals = pd.DataFrame({
+        'scenario_id': np.repeat(scenarios['scenario_id'].to_numpy(), len(years)),
+        'year': np.tile(years, len(scenarios)),
+        'estimated_total': (membership @ np.nan_to_num(estimate)).T.ravel(),
+        'calibrated_total': (membership @ np.nan_to_num(calibrated)).T.ravel(),
+        'cells_estimated': (membership @ ~np.isnan(estimate)).T.ravel().astype(int),
+    })
+    totals.loc[np.isnan(factor).repeat(len(years)), 'calibrated_total'] = np.nan
+
+    cells = None
+    if return_cells:
+        n = len(merged)
+        cells = pd.DataFrame({
+            'scenario_id': np.repeat(scenarios['scenario_id'].to_numpy(), n),
+            'year': np.tile(merged['year'].to_numpy(int), len(scenarios)),
+            'latitude': np.tile(merged['latitude'].to_numpy(float), len(scenarios)),
+            'longitude': np.tile(merged['longitude'].to_numpy(float), len(scenarios)),
+            'estimated_woodchuck_population': estimate.T.ravel(),
+            'estimated_woodchuck_population_calibrated': calibrated.T.ravel(),
+        }).dropna(subset=['estimated_woodchuck_population'])
+
+    return totals, cells
+
+
+def parameter_grid(**grid):
+    """Cartesian product of the given parameter lists, other parameters at integrate_data defaults."""
+    values = {**DEFAULT_GRID, **{k: list(v) for k, v in grid.items()}}
+    unknown = set(values) - set(DEFAULT_GRID)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    scenarios = pd.DataFrame(list(itertools.product(*values.values())), columns=list(values), dtype=object)
+    scenarios.insert(0, 'scenario_id', range(len(scenarios)))
+    return scenarios
+
+
+def sweep(dataset_root=None, scenarios=None, return_cells=True, max_workers=None, read_csv=pd.read_csv, **grid):
+    """Evaluate many integrate_data parameter settings against one loaded base frame.
+
+    Pass a scenarios frame (see parameter_grid) or parameter lists as keyword
+    arguments. Returns (scenarios, totals, cells): per-year totals for every
+    scenario and, if return_cells, the per-cell estimates in long format.
+    """
+    base = load_base_frame(dataset_root, read_csv)
+    if base is None:
+        raise ValueError("Sightings files are missing latitude, longitude or count columns")
+    merged, sight_col, year_col, _ = base
+    if year_col is None:
+        raise ValueError("Sweeps need yearly sightings files")
+
+    if scenarios is None:
+        scenarios = parameter_grid(**grid)
+    print(f"Sweeping {len(scenarios)} scenarios over {len(merged)} grid rows")
+
+    workers = max_workers or os.cpu_count() or 1
+    chunks = [scenarios.iloc[idx] for idx in np.array_split(np.arange(len(scenarios)), min(workers, len(scenarios))) if len(idx)]
+
+    if workers == 1 or len(chunks) == 1:
+        _init_worker((merged, sight_col))
+        results = [_evaluate(c, return_cells) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=((merged, sight_col),)) as pool:
+            results = list(pool.map(_evaluate, chunks, [return_cells] * len(chunks)))
+
+    totals = pd.concat([r[0] for r in results], ignore_index=True)
+    cells = pd.concat([r[1] for r in results], ignore_index=True) if return_cells else None
+    return scenarios, totals, cells
+
+
+if __name__ == "__main__":
+    dataset_root = Path(__file__).resolve().parent.parent / "Dataset"
+
+    scenarios, totals, _ = sweep(
+        dataset_root=dataset_root,
+        return_cells=False,
+        detection_rate=[0.01, 0.02, 0.05, 0.1],
+        estimation_mode=['hybrid', 'sightings', 'density'],
+        woodchuck_per_person_ratio=[0.01, 0.05, 0.1],
+    )
+
+    summary = totals.merge(scenarios, on='scenario_id')
+    output_file_path = dataset_root / "cleanData" / "integration_sweep_totals.csv"
+    summary.to_csv(output_file_path, index=False)
+    print(f"Saved sweep totals: {output_file_path}")